@@ -1,12 +1,24 @@
+import csv
+import hashlib
+import io
 import json
+import heapq
+import itertools
 import time
 import threading
-from collections import deque
-from dataclasses import dataclass, asdict
-from typing import Deque, Dict, List
+from datetime import datetime
+from queue import Empty, SimpleQueue
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List
+from urllib.parse import parse_qsl
 import os
+import sys
 
-from flask import Flask, render_template_string, request, jsonify
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from flask import Flask, Response, render_template_string, request, jsonify
 
 # ---- Optional dependency handling (websocket-client) ----
 try:
@@ -24,6 +36,72 @@ except Exception:
     requests = None
     REQUESTS_AVAILABLE = False
 
+if REQUESTS_AVAILABLE:
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    # Shared keep-alive session for bootstrap fetches (repeat seeding skips the TCP/TLS handshake)
+    _http = requests.Session()
+    _http_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=16,
+                                max_retries=Retry(total=2, backoff_factor=0.1))
+    _http.mount("https://", _http_adapter)
+    _http.mount("http://", _http_adapter)
+else:
+    _http = None
+
+# ---- Optional dependency handling (orjson for fast JSON parse/serialize) ----
+try:
+    import orjson  # type: ignore
+    ORJSON_AVAILABLE = True
+except Exception:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    _loads = orjson.loads  # accepts str or bytes
+    _dumps = orjson.dumps  # compact, returns bytes
+else:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+if ORJSON_AVAILABLE:
+    # sorted keys like Flask's provider: clients (and the CSV report) see the same key order
+    _JSONIFY_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
+def _jsonify(*args, **kwargs) -> Response:
+    """Drop-in for flask.jsonify; with orjson, NumPy scalars/arrays serialize natively."""
+    if not ORJSON_AVAILABLE:
+        return jsonify(*args, **kwargs)
+    obj = kwargs if not args else (args[0] if len(args) == 1 else list(args))
+    return Response(orjson.dumps(obj, option=_JSONIFY_OPTS), mimetype="application/json")
+
+# ---- Optional dependency handling (numba for JIT-compiled numeric kernels) ----
+try:
+    import numba  # type: ignore
+    NUMBA_AVAILABLE = True
+except Exception:
+    numba = None
+    NUMBA_AVAILABLE = False
+
+# Cached numba kernels live in kernels.py: numba's on-disk cache re-imports the module a
+# kernel was compiled in, which must not re-run this file's import-time side effects. It
+# is always imported as top-level "kernels", so the name recorded in the cache is the same
+# whether this file runs as a script, as "app" or as "bitunix_test.app".
+_HERE = os.path.dirname(os.path.abspath(__file__))
+if _HERE not in sys.path:
+    sys.path.insert(0, _HERE)
+import kernels
+
+# ---- Optional dependency handling (waitress, a threaded production WSGI server) ----
+try:
+    import waitress  # type: ignore
+    WAITRESS_AVAILABLE = True
+except Exception:
+    waitress = None
+    WAITRESS_AVAILABLE = False
+
 
 app = Flask(__name__)
 APP_NAME = "JML'S Money Maker"
@@ -35,10 +113,12 @@ DEFAULT_SYMBOL = "BTCUSDT"
 DEFAULT_INTERVAL = "market_kline_1min"  # server pushes roughly every 500ms
 MAX_CANDLES = 500
 MAX_TRADES = 2000
+PING_INTERVAL = 15  # seconds between Bitunix JSON pings
 
 # --------------------------- Data Models ---------------------------
 @dataclass
 class Candle:
+    __slots__ = ("t", "o", "h", "l", "c", "v")
     t: int   # server ts (ms)
     o: float
     h: float
@@ -46,13 +126,181 @@ class Candle:
     c: float
     v: float  # base volume
 
+class CandleRing:
+    """Fixed-size ring buffer storing candles column-wise (one NumPy array per field).
+
+    A push writes the columns before moving head, so once the ring is full an unlocked
+    reader can see a torn row (new t/o, old v). Readers must hold buffer_lock, or go
+    through _snapshot(), which copies all columns under it.
+    """
+
+    def __init__(self, maxlen: int = MAX_CANDLES):
+        self.maxlen = maxlen
+        self.t = np.empty(maxlen, dtype=np.int64)
+        self.o = np.empty(maxlen, dtype=np.float64)
+        self.h = np.empty(maxlen, dtype=np.float64)
+        self.l = np.empty(maxlen, dtype=np.float64)
+        self.c = np.empty(maxlen, dtype=np.float64)
+        self.v = np.empty(maxlen, dtype=np.float64)
+        self.head = 0  # next slot to write
+        self.n = 0     # number of valid candles
+        self.version = 0  # bumped on every mutation; keys cached snapshots
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, idx: int) -> Candle:
+        if idx < 0:
+            idx += self.n
+        if not 0 <= idx < self.n:
+            raise IndexError("candle index out of range")
+        j = (self.head - self.n + idx) % self.maxlen
+        return Candle(t=int(self.t[j]), o=float(self.o[j]), h=float(self.h[j]),
+                      l=float(self.l[j]), c=float(self.c[j]), v=float(self.v[j]))
+
+    def __iter__(self):
+        for i in range(self.n):
+            yield self[i]
+
+    def push(self, t: int, o: float, h: float, l: float, c: float, v: float):
+        i = self.head
+        self.t[i] = t
+        self.o[i] = o
+        self.h[i] = h
+        self.l[i] = l
+        self.c[i] = c
+        self.v[i] = v
+        self.head = (i + 1) % self.maxlen
+        if self.n < self.maxlen:
+            self.n += 1
+        self.version += 1
+
+    def append(self, cndl: Candle):
+        self.push(cndl.t, cndl.o, cndl.h, cndl.l, cndl.c, cndl.v)
+
+    def extend(self, rows):
+        """Push many (t, o, h, l, c, v) tuples with one column write per field."""
+        rows = rows[-self.maxlen:]  # older rows would be overwritten anyway
+        k = len(rows)
+        if not k:
+            return
+        slots = (self.head + np.arange(k)) % self.maxlen
+        for arr, col in zip((self.t, self.o, self.h, self.l, self.c, self.v), zip(*rows)):
+            arr[slots] = col
+        self.head = (self.head + k) % self.maxlen
+        self.n = min(self.n + k, self.maxlen)
+        self.version += 1
+
+    def clear(self):
+        self.head = 0
+        self.n = 0
+        self.version += 1
+
+    def last(self, field: str):
+        """Most recent value of a field; the ring must not be empty. Caller holds buffer_lock."""
+        return getattr(self, field)[self.head - 1]
+
+    def view(self, field: str, k: int = None) -> np.ndarray:
+        """Last k values of a field, oldest first. Zero-copy unless the range wraps; caller holds buffer_lock."""
+        arr = getattr(self, field)
+        k = self.n if k is None else max(0, min(k, self.n))
+        start = self.head - k
+        if start >= 0:
+            return arr[start:self.head]
+        return np.concatenate((arr[start:], arr[:self.head]))
+
+_trade_dt = np.dtype([("t", "i8"), ("p", "f8"), ("v", "f8"), ("s", "S4")])
+
+class TradeRing:
+    """Fixed-size ring buffer of trades in one preallocated structured array (t, p, v, s)."""
+
+    def __init__(self, maxlen: int = MAX_TRADES):
+        self.maxlen = maxlen
+        self.rows = np.zeros(maxlen, dtype=_trade_dt)
+        self.head = 0  # next slot to write
+        self.n = 0     # number of valid trades
+        self.lock = threading.Lock()  # pushes come from the consumer thread, reads from routes
+
+    def __len__(self) -> int:
+        return self.n
+
+    def extend(self, rows):
+        """Append (t, p, v, s) rows under one lock acquisition."""
+        with self.lock:
+            for row in rows:
+                i = self.head
+                self.rows[i] = row
+                self.head = (i + 1) % self.maxlen
+                if self.n < self.maxlen:
+                    self.n += 1
+
+    def push(self, t: int, p: float, v: float, s: bytes):
+        self.extend(((t, p, v, s),))
+
+    def clear(self):
+        with self.lock:
+            self.head = 0
+            self.n = 0
+
+    def tail(self, k: int) -> list:
+        """Last k trades as dicts, oldest first."""
+        with self.lock:
+            k = max(0, min(k, self.n))
+            start = self.head - k
+            rows = self.rows[start:self.head] if start >= 0 else np.concatenate((self.rows[start:], self.rows[:self.head]))
+            rows = rows.tolist()
+        return [{"t": t, "p": p, "v": v, "s": s.decode()} for t, p, v, s in rows]
+
+class ShardedStore:
+    """Id -> record map split across independently locked shards, listed in insertion order."""
+
+    def __init__(self, nshards: int = 16):
+        assert nshards & (nshards - 1) == 0, "nshards must be a power of two"
+        self._mask = nshards - 1
+        self._maps = [dict() for _ in range(nshards)]
+        self._seqs = [dict() for _ in range(nshards)]  # key -> insertion sequence number
+        self._locks = [threading.Lock() for _ in range(nshards)]
+        self._counter = itertools.count()
+
+    def shard(self, key):
+        """(lock, dict) of the shard owning key, for read-modify-write under that lock only."""
+        i = hash(key) & self._mask
+        return self._locks[i], self._maps[i]
+
+    def put(self, key, value):
+        i = hash(key) & self._mask
+        with self._locks[i]:
+            self._maps[i][key] = value
+            self._seqs[i].setdefault(key, next(self._counter))  # re-put keeps its position, like dict
+
+    def get(self, key, default=None):
+        i = hash(key) & self._mask
+        with self._locks[i]:
+            return self._maps[i].get(key, default)
+
+    def values(self) -> list:
+        """Snapshot of all records; each shard lock is held only while copying that shard."""
+        rows = []
+        for lock, m, seqs in zip(self._locks, self._maps, self._seqs):
+            with lock:
+                rows.extend((seqs[k], v) for k, v in m.items())
+        rows.sort(key=lambda r: r[0])
+        return [v for _, v in rows]
+
+    def clear(self):
+        for lock, m, seqs in zip(self._locks, self._maps, self._seqs):
+            with lock:
+                m.clear()
+                seqs.clear()
+
  # Global state (per symbol)
-candles: Dict[str, Deque[Candle]] = {}
-trades: Dict[str, Deque[dict]] = {}
+candles: Dict[str, CandleRing] = {}
+trades: Dict[str, TradeRing] = {}
+# (candle_ring, trade_ring) per symbol, so hot paths resolve both with one lookup
+_buffers: Dict[str, tuple] = {}
+# symbol -> (ring version, read-only column copies); see _snapshot
+_snapshots: Dict[str, tuple] = {}
 ws_status = {
-    "connected": False,
-    "last_msg_ts": None,
-    "last_error": None,
     "thread_alive": False,
     "enabled": WEBSOCKET_AVAILABLE,
     "url": PUBLIC_WS_URL,
@@ -63,16 +311,40 @@ ws_status = {
 
 # Handle to current websocket connection (set by _ws_thread)
 ws_current = None  # type: ignore
+# Pending ping timer for the current connection (armed in _on_open, cancelled in _on_close)
+ws_ping_timer = None  # type: ignore
+
+# Hot connection fields written on every frame / error. Kept outside ws_status as
+# bare globals: a single assignment is atomic under the GIL, so writers and
+# /api/health need no lock for them.
+ws_connected = False
+ws_last_msg_ts = None
+ws_last_error = None
+
+# Serialized /api/health body, keyed on the hot fields above. ws_status mutations
+# set _health_dirty (a bare bool, atomic under the GIL) so the next poll rebuilds.
+_health_cache = None  # (key, bytes)
+_health_dirty = True
+
+def _status_changed():
+    global _health_dirty
+    _health_dirty = True
+
+# Raw WS frames handed from the socket callback to _consumer_thread
+_ingress: SimpleQueue = SimpleQueue()
+INGRESS_BATCH = 128  # max frames parsed per burst
+# Parsed candles waiting for a contended buffer_lock (consumer thread only)
+_deferred_candles: list = []
 
 state_lock = threading.Lock()
+# Serializes writers (WS thread, bootstrap/reset routes) of the candle rings
+buffer_lock = threading.Lock()
 
 # --------------------------- Paper Orders & Strategy Config ---------------------------
-paper_orders: Dict[str, dict] = {}
-order_lock = threading.Lock()
+paper_orders = ShardedStore()
 
 # --------------------------- Positions (paper) ---------------------------
-positions: Dict[str, dict] = {}
-position_lock = threading.Lock()
+positions = ShardedStore()
 
 strategy_cfg = {
     "window": 20,
@@ -81,28 +353,72 @@ strategy_cfg = {
 }
 
 def _now_ms() -> int:
-    return int(time.time() * 1000)
+    return time.time_ns() // 1_000_000
 
 # --- Position/candle helpers ---
 def _last_close(symbol: str) -> float:
-    _ensure_buffers(symbol)
-    buf = candles.get(symbol)
-    if not buf or len(buf) == 0:
+    c = _snapshot(symbol)[4]
+    if not len(c):
         return 0.0
-    return float(buf[-1].c)
+    return float(c[-1])
+
+def _prior_levels(h, l, lookback: int):
+    """(hh, ll) of the lookback bars ending at the current one, current excluded; lookback <= 0 spans the whole buffer."""
+    k = lookback if lookback > 0 else len(h)
+    return float(h[-k:][:-1].max()), float(l[-k:][:-1].min())
+
+def _fast_float(x) -> float:
+    """float(x), skipped when the JSON parser already produced a float."""
+    if type(x) is float:
+        return x
+    return float(x)
+
+def _trade_ts(x) -> int:
+    """Trade timestamp as epoch ms; accepts ms numbers, digit strings or ISO-8601."""
+    if isinstance(x, (int, float)):
+        return int(x)
+    if not x:
+        return 0
+    if x.isdigit():
+        return int(x)
+    return int(datetime.fromisoformat(x.replace("Z", "+00:00")).timestamp() * 1000)
+
+_id_seq = itertools.count(1)  # next() on a count is atomic under the GIL, no lock needed
 
 def _gen_id(prefix: str) -> str:
-    return f"{prefix}-{_now_ms()}"
+    """prefix-<ms>-<seq hex>: time-ordered and unique even for ids minted in the same millisecond."""
+    return f"{prefix}-{_now_ms()}-{next(_id_seq):x}"
 
 # --------------------------- WebSocket Client ---------------------------
 def _ensure_buffers(symbol: str):
-    if symbol not in candles:
-        candles[symbol] = deque(maxlen=MAX_CANDLES)
-    if symbol not in trades:
-        trades[symbol] = deque(maxlen=MAX_TRADES)
+    """Return the symbol's (candle_ring, trade_ring), creating them on first use."""
+    pair = _buffers.get(symbol)
+    if pair is None:
+        # keys are interned so later lookups with the same string object short-circuit on identity
+        if type(symbol) is str:
+            symbol = sys.intern(symbol)
+        # setdefault keeps racing creators on one pair; rings are only allocated on a miss
+        pair = _buffers.setdefault(symbol, (CandleRing(MAX_CANDLES), TradeRing(MAX_TRADES)))
+        candles[symbol], trades[symbol] = pair
+    return pair
+
+def _snapshot(symbol: str):
+    """Read-only (t, o, h, l, c, v) column copies of a symbol's candles, reused until the ring changes."""
+    ring = _ensure_buffers(symbol)[0]
+    hit = _snapshots.get(symbol)
+    if hit is not None and hit[0] == ring.version:
+        return hit[1]
+    with buffer_lock:
+        ver = ring.version
+        cols = tuple(np.array(ring.view(f)) for f in ("t", "o", "h", "l", "c", "v"))
+    for col in cols:
+        col.flags.writeable = False
+    _snapshots[symbol] = (ver, cols)
+    return cols
 
 def _on_open(ws):
     """Subscribe to kline and trade channels when connection opens."""
+    global ws_connected, ws_last_error
     try:
         print("[WS] on_open: subscribing to", ws_status["symbol"], ws_status["interval"], "and trade")
         sub = {
@@ -112,93 +428,137 @@ def _on_open(ws):
                 {"symbol": ws_status["symbol"], "ch": "trade"},
             ],
         }
-        ws.send(json.dumps(sub))
+        ws.send(_dumps(sub))
         print("[WS] subscribe sent:", sub)
+        ws_connected = True
+        _schedule_ping(ws)
         with state_lock:
-            ws_status["connected"] = True
             ws_status["subscribed"]["kline"] = True
             ws_status["subscribed"]["trade"] = True
+            _status_changed()
     except Exception as e:
         print("[WS][ERROR] on_open:", e)
-        with state_lock:
-            ws_status["last_error"] = f"on_open error: {e}"
+        ws_last_error = f"on_open error: {e}"
 
 def _on_message(ws, message):
-    """Handle incoming messages from the WebSocket."""
-    # lightweight debug: show channel and a small snippet
-    try:
-        peek = message[:120] + ("..." if len(message) > 120 else "")
-        print("[WS] on_message len", len(message), "peek:", peek)
-    except Exception:
-        pass
-    try:
-        data = json.loads(message)
-        ch = data.get("ch")
-        sym = data.get("symbol", ws_status["symbol"])
-        ts = data.get("ts")
-        with state_lock:
-            ws_status["last_msg_ts"] = ts or int(time.time() * 1000)
-        _ensure_buffers(sym)
+    """Queue the raw frame; parsing happens in bursts on the consumer thread."""
+    _ingress.put_nowait(message)
 
-        if ch and ch.startswith("market_kline_"):
-            d = data.get("data") or {}
+def _consumer_thread():
+    """Drain queued WS frames in bursts of up to INGRESS_BATCH and apply each burst at once."""
+    while True:
+        try:
+            # with candles deferred, wake up shortly even if no frame arrives so they get flushed
+            batch = [_ingress.get(timeout=0.05 if _deferred_candles else None)]
+        except Empty:
+            batch = []
+        while len(batch) < INGRESS_BATCH:
             try:
-                cndl = Candle(
-                    t=ts or int(time.time() * 1000),
-                    o=float(d.get("o", 0)),
-                    h=float(d.get("h", 0)),
-                    l=float(d.get("l", 0)),
-                    c=float(d.get("c", 0)),
-                    v=float(d.get("b", 0)),
-                )
-                candles[sym].append(cndl)
-            except Exception as e:
-                with state_lock:
-                    ws_status["last_error"] = f"parse_kline error: {e}"
-
-        elif ch == "trade":
-            arr = data.get("data") or []
-            for t in arr:
-                trades[sym].append(
-                    {
-                        "t": t.get("t"),
-                        "p": float(t.get("p", 0)),
-                        "v": float(t.get("v", 0)),
-                        "s": t.get("s"),
-                    }
-                )
-    except Exception as e:
-        print("[WS][ERROR] on_message:", e)
-        with state_lock:
-            ws_status["last_error"] = f"on_message error: {e}"
+                batch.append(_ingress.get_nowait())
+            except Empty:
+                break
+        _apply_frames(batch)
+
+def _apply_frames(batch):
+    """Parse a burst of frames; candle writes share one (contention-aware) buffer_lock acquisition."""
+    global ws_last_msg_ts, ws_last_error
+    new_candles = []
+    last_ts = None
+    for message in batch:
+        try:
+            data = _loads(message)
+            ch = data.get("ch")
+            sym = data.get("symbol", ws_status["symbol"])
+            ts = data.get("ts")
+            last_ts = ts or _now_ms()
+            ring, tbuf = _ensure_buffers(sym)
+
+            if ch and ch.startswith("market_kline_"):
+                d = data.get("data") or {}
+                try:
+                    # plain (t, o, h, l, c, v) tuple: pushed straight into the ring columns
+                    new_candles.append((ring, (
+                        last_ts,
+                        _fast_float(d.get("o", 0)),
+                        _fast_float(d.get("h", 0)),
+                        _fast_float(d.get("l", 0)),
+                        _fast_float(d.get("c", 0)),
+                        _fast_float(d.get("b", 0)),
+                    )))
+                except Exception as e:
+                    ws_last_error = f"parse_kline error: {e}"
+
+            elif ch == "trade":
+                arr = data.get("data") or []
+                rows = []
+                for t in arr:
+                    # a malformed trade is skipped on its own; the rest of the frame is kept
+                    try:
+                        rows.append((
+                            _trade_ts(t.get("t")),
+                            _fast_float(t.get("p", 0)),
+                            _fast_float(t.get("v", 0)),
+                            (t.get("s") or "").encode()[:4],
+                        ))
+                    except Exception as e:
+                        ws_last_error = f"parse_trade error: {e}"
+                tbuf.extend(rows)
+        except Exception as e:
+            print("[WS][ERROR] on_message:", e)
+            ws_last_error = f"on_message error: {e}"
+
+    if last_ts is not None:
+        ws_last_msg_ts = last_ts
+    _deferred_candles.extend(new_candles)
+    # If a route holds buffer_lock (e.g. a bootstrap replace), keep parsing instead of
+    # parking on it and retry next burst; block only once a full burst has backed up.
+    if _deferred_candles and buffer_lock.acquire(blocking=len(_deferred_candles) >= INGRESS_BATCH):
+        try:
+            for ring, row in _deferred_candles:
+                ring.push(*row)
+        finally:
+            buffer_lock.release()
+        _deferred_candles.clear()
 
 def _on_error(ws, error):
     """Store errors and mark connection as disconnected."""
-    with state_lock:
-        ws_status["last_error"] = str(error)
-        ws_status["connected"] = False
+    global ws_connected, ws_last_error
+    ws_last_error = str(error)
+    ws_connected = False
     print("[WS][ERROR] socket error:", error)
 
 def _on_close(ws, status_code, msg):
     """Handle cleanly closing the WebSocket connection."""
+    global ws_connected
+    ws_connected = False
+    if ws_ping_timer is not None:
+        ws_ping_timer.cancel()
     with state_lock:
-        ws_status["connected"] = False
         ws_status["subscribed"]["kline"] = False
         ws_status["subscribed"]["trade"] = False
+        _status_changed()
     print(f"[WS] on_close status={status_code} msg={msg}")
     global ws_current
     ws_current = None
 
-def _ping_loop(ws):
-    """Send periodic ping frames expected by Bitunix."""
-    while True:
-        time.sleep(15)
-        if not ws_status["connected"]:
-            break
+def _schedule_ping(ws):
+    """Arm a one-shot timer for the next Bitunix JSON ping; it re-arms itself while ws is current."""
+    global ws_ping_timer
+
+    def _ping():
+        if ws is not ws_current or not ws_connected:
+            return
         try:
-            ws.send(json.dumps({"op": "ping", "ping": int(time.time())}))
+            # Bitunix expects an application-level ping carrying a fresh timestamp
+            ws.send(_dumps({"op": "ping", "ping": int(time.time())}))
         except Exception:
-            break
+            return
+        _schedule_ping(ws)
+
+    timer = threading.Timer(PING_INTERVAL, _ping)
+    timer.daemon = True
+    ws_ping_timer = timer
+    timer.start()
 
 # --- Helper to close current websocket connection (forces reconnect) ---
 def _ws_close():
@@ -212,7 +572,7 @@ def _ws_close():
 
 def _ws_thread():
     """Background thread to manage the WebSocket connection with auto-reconnect."""
-    global ws_current
+    global ws_current, ws_last_error
     if not WEBSOCKET_AVAILABLE:
         return
     while True:
@@ -227,91 +587,188 @@ def _ws_thread():
             )
             # Save handle so API endpoints can request an immediate reconnect by closing it
             ws_current = ws
-            ping_thread = threading.Thread(target=_ping_loop, args=(ws,), daemon=True)
-            ping_thread.start()
             ws.run_forever()
             print("[WS] run_forever() returned; will attempt reconnect")
         except Exception as e:
             print("[WS][EXCEPTION] in _ws_thread:", e)
-            with state_lock:
-                ws_status["last_error"] = f"ws_thread exception: {e}"
+            ws_last_error = f"ws_thread exception: {e}"
             # Ensure handle cleared on failure
             ws_current = None
         time.sleep(3)  # backoff before reconnecting
 
 # Start background thread on boot
 if WEBSOCKET_AVAILABLE:
+    threading.Thread(target=_consumer_thread, daemon=True).start()
     t = threading.Thread(target=_ws_thread, daemon=True)
     t.start()
     with state_lock:
         ws_status["thread_alive"] = True
+        _status_changed()
 
 # --------------------------- Strategy Helpers ---------------------------
+def _spike_hits_np(v, window, multiplier):
+    """Indices into v whose volume / trailing-window mean >= multiplier, with the mean and ratio."""
+    # trailing `window` volumes before each candle, summed bar by bar in slice order so the
+    # sums match the sequential sum() bit for bit (a cumsum difference drifts across the series)
+    m = max(len(v) - window, 0)
+    vsum = np.zeros(m)
+    for k in range(window):
+        vsum += v[k:k + m]
+    avg = vsum / float(window)
+    ratio = np.zeros_like(avg)
+    np.divide(v[window:], avg, out=ratio, where=avg > 0)
+    j = np.flatnonzero(ratio >= multiplier)
+    return j + window, avg[j], ratio[j]
+
+_spike_hits = kernels.spike_hits if NUMBA_AVAILABLE else _spike_hits_np
+_spike_hits_inline = kernels.spike_hits_inline if NUMBA_AVAILABLE else None
+
+def _spike_scanner(window: int, multiplier: float):
+    """Spike scan with window/multiplier frozen in as compile-time constants (numba only)."""
+    def scan(v):
+        return _spike_hits_inline(v, window, multiplier)
+    return numba.njit(scan)
+
+# (key, scanner) specialized for the active strategy params, once its compile has finished
+_active_scanner = None
+
+def _warm_spike_scanner():
+    """Compile the scanner for the active strategy params on a background thread.
+
+    Requests keep using the generic kernel until it is ready, so no JIT latency lands on the
+    request path, and only the active pair is ever held (no cache to evict and recompile).
+    """
+    if not NUMBA_AVAILABLE:
+        return
+    key = (int(strategy_cfg["window"]), float(strategy_cfg["multiplier"]))
+    hit = _active_scanner
+    if hit is not None and hit[0] == key:
+        return
+
+    def build():
+        global _active_scanner
+        try:
+            scan = _spike_scanner(*key)
+            empty = np.empty(0)
+            empty.flags.writeable = False  # snapshots are read-only, which numba types separately
+            scan(empty)
+        except Exception as e:
+            print("[WARN] spike scanner compile failed:", e)
+            return
+        # a config change during the compile leaves the newer params' build to publish
+        if key == (strategy_cfg["window"], strategy_cfg["multiplier"]):
+            _active_scanner = (key, scan)
+
+    threading.Thread(target=build, daemon=True).start()
+
+_warm_spike_scanner()
+
+def _resolve_np(h, l, ti, tp, sl, is_long, resolve_bars, tp_wins):
+    """(win, loss, bars_used) per trade entered at bar ti: first of the next resolve_bars bars to touch TP/SL."""
+    ntr = len(ti)
+    if resolve_bars <= 0 or ntr == 0:
+        return np.zeros(ntr, dtype=np.bool_), np.zeros(ntr, dtype=np.bool_), np.zeros(ntr, dtype=np.int64)
+    fwd_h = sliding_window_view(h, resolve_bars)[ti + 1]
+    fwd_l = sliding_window_view(l, resolve_bars)[ti + 1]
+    lng = is_long[:, None]
+    hit_tp = np.where(lng, fwd_h >= tp[:, None], fwd_l <= tp[:, None])
+    hit_sl = np.where(lng, fwd_l <= sl[:, None], fwd_h >= sl[:, None])
+    hit = hit_tp | hit_sl
+    first = hit.argmax(axis=1)
+    rows = np.arange(ntr)
+    resolved = hit[rows, first]
+    win = resolved & hit_tp[rows, first] & (~hit_sl[rows, first] | tp_wins)
+    return win, resolved & ~win, np.where(resolved, first + 1, resolve_bars)
+
+_resolve_trades = kernels.resolve_trades if NUMBA_AVAILABLE else _resolve_np
+
+def _round_col(a, nd):
+    """round(x, nd) over a float column, as a list.
+
+    np.round scales by 10**nd first, which can land a hair on the wrong side of .5; those
+    near-tie elements are redone with Python's correctly-rounded round() so output is unchanged.
+    """
+    scaled = a * 10.0 ** nd
+    out = np.round(a, nd).tolist()
+    near = np.abs(scaled - np.floor(scaled) - 0.5) <= np.maximum(1e-6, 4 * np.spacing(np.abs(scaled)))
+    for k in np.flatnonzero(near).tolist():
+        out[k] = round(float(a[k]), nd)
+    return out
+
 def compute_spikes(symbol: str, window: int = 20, multiplier: float = 2.5, limit: int = 50):
     """Compute volume spikes given a rolling window and threshold multiplier."""
-    _ensure_buffers(symbol)
-    buf = list(candles[symbol])[-(window + limit + 5):]
-    if len(buf) < max(window, 5):
+    return _spikes_in(_snapshot(symbol), window, multiplier, limit)
+
+def _spikes_in(snap, window: int, multiplier: float, limit: int):
+    """compute_spikes over one (t, o, h, l, c, v) snapshot, so each hit's bar and avg_v/ratio agree."""
+    n = len(snap[5])
+    tail = tuple(col[n - max(0, min(window + limit + 5, n)):] for col in snap)
+    v = tail[5]
+    if len(v) < max(window, 5):
         return []
 
-    spikes = []
-    for i in range(window, len(buf)):
-        prev = buf[i - window:i]
-        avg_v = sum(c.v for c in prev) / float(len(prev))
-        cur = buf[i]
-        ratio = (cur.v / avg_v) if avg_v > 0 else 0
-        if ratio >= multiplier:
-            direction = "long" if cur.c >= cur.o else "short"
-            spikes.append(
-                {
-                    "t": cur.t,
-                    "o": cur.o,
-                    "h": cur.h,
-                    "l": cur.l,
-                    "c": cur.c,
-                    "v": cur.v,
-                    "avg_v": avg_v,
-                    "ratio": ratio,
-                    "direction_hint": direction,
-                }
-            )
-    return spikes[-limit:]
+    key = (int(window), float(multiplier))
+    hit = _active_scanner
+    if hit is not None and hit[0] == key:
+        # active strategy params, already compiled: use the specialized scanner
+        idx, avg, ratio = hit[1](v)
+    else:
+        idx, avg, ratio = _spike_hits(v, *key)
+    # keep only the hits that will be returned, then gather their rows column-wise
+    sel = range(len(idx))[-limit:]
+    sel = slice(sel.start, sel.stop)
+    idx = idx[sel]
+    t, o, h, l, c, vv = (col[idx].tolist() for col in tail)
+    return [
+        {
+            "t": t[j],
+            "o": o[j],
+            "h": h[j],
+            "l": l[j],
+            "c": c[j],
+            "v": vv[j],
+            "avg_v": a,
+            "ratio": r,
+            "direction_hint": "long" if c[j] >= o[j] else "short",
+        }
+        for j, (a, r) in enumerate(zip(avg[sel].tolist(), ratio[sel].tolist()))
+    ]
 
 def breakout_signal(symbol: str, lookback: int = 20, window: int = 20, multiplier: float = 2.5):
     """Determine breakout signal based on volume spikes and price breakout from range."""
-    _ensure_buffers(symbol)
-    buf = list(candles[symbol])
-    if len(buf) < max(lookback + 1, window + 1):
+    snap = _snapshot(symbol)
+    _, _, hs, ls, cs, _ = snap
+    if len(cs) < max(lookback + 1, window + 1):
         return {"hasSignal": False, "reason": "insufficient candles"}
 
-    spikes = compute_spikes(symbol, window=window, multiplier=multiplier, limit=5)
+    # spikes and the latest bar come from the same snapshot
+    spikes = _spikes_in(snap, window, multiplier, 5)
     if not spikes:
         return {"hasSignal": False, "reason": "no spikes"}
 
-    cur = buf[-1]
-    range_buf = buf[-lookback:]
-    hh = max(c.h for c in range_buf[:-1])  # exclude current candle
-    ll = min(c.l for c in range_buf[:-1])
+    # latest bar straight from the columns, no Candle built
+    c, h, l = float(cs[-1]), float(hs[-1]), float(ls[-1])
+    hh, ll = _prior_levels(hs, ls, lookback)  # exclude current candle
 
     direction = None
     entry = None
-    if cur.c > hh and spikes[-1]["ratio"] >= multiplier:
+    if c > hh and spikes[-1]["ratio"] >= multiplier:
         direction = "long"
-        entry = cur.c
-    elif cur.c < ll and spikes[-1]["ratio"] >= multiplier:
+        entry = c
+    elif c < ll and spikes[-1]["ratio"] >= multiplier:
         direction = "short"
-        entry = cur.c
+        entry = c
 
     if not direction:
-        return {"hasSignal": False, "reason": "no breakout", "hh": hh, "ll": ll, "last_close": cur.c}
+        return {"hasSignal": False, "reason": "no breakout", "hh": hh, "ll": ll, "last_close": c}
 
     # basic risk/reward: stop loss at recent range
     if direction == "long":
-        sl = max(ll, cur.c - (cur.h - cur.l))
+        sl = max(ll, c - (h - l))
         risk = entry - sl
         tp = entry + 1.5 * risk
     else:
-        sl = min(hh, cur.c + (cur.h - cur.l))
+        sl = min(hh, c + (h - l))
         risk = sl - entry
         tp = entry - 1.5 * risk
 
@@ -663,98 +1120,148 @@ PAGE = """
 </html>
 """
 
+# The page and endpoint index are constant: render/serialize once at import, serve with an ETag
+with app.app_context():
+  _INDEX_HTML = render_template_string(PAGE).encode("utf-8")
+_INDEX_ETAG = hashlib.sha1(_INDEX_HTML).hexdigest()
+
+def _static_response(body: bytes, etag: str, mimetype: str):
+  """Serve precomputed bytes; answers 304 when the client's If-None-Match matches."""
+  resp = Response(body, mimetype=mimetype)
+  resp.set_etag(etag)
+  return resp.make_conditional(request)
+
+def _body():
+  """Request JSON body, or {} when absent/invalid; same result as get_json(silent=True) or {},
+  parsed straight from the raw bytes with _loads."""
+  if not request.is_json:
+    return {}
+  raw = request.get_data(cache=False)
+  try:
+    return (_loads(raw) if raw else None) or {}
+  except ValueError:
+    return {}
+
+def _query_dict(qs: bytes) -> dict:
+  """First value per key, like request.args.get()."""
+  d = {}
+  for k, v in parse_qsl(qs.decode("utf-8", "replace"), keep_blank_values=True):
+    d.setdefault(k, v)
+  return d
+
+# The dashboard polls identical URLs; parse each distinct query string once
+@lru_cache(maxsize=256)
+def _parse_tail_args(qs: bytes):
+  d = _query_dict(qs)
+  return d.get("symbol", DEFAULT_SYMBOL), int(d.get("limit", "100"))
+
+@lru_cache(maxsize=256)
+def _parse_spike_args(qs: bytes):
+  d = _query_dict(qs)
+  return (d.get("symbol", DEFAULT_SYMBOL), int(d.get("window", "20")),
+          float(d.get("multiplier", "2.5")), int(d.get("limit", "20")))
+
 @app.route("/")
 def index():
-  return render_template_string(PAGE)
+  return _static_response(_INDEX_HTML, _INDEX_ETAG, "text/html")
 
 @app.route("/api/health")
 def api_health():
-  with state_lock:
-    return jsonify(
-      connected=ws_status["connected"],
-      last_msg_ts=ws_status["last_msg_ts"],
-      last_error=ws_status["last_error"],
+  # Lock-free read: hot fields are atomic globals, config values are swapped whole.
+  # Polls between two changes share one serialized body.
+  global _health_cache, _health_dirty
+  key = (ws_connected, ws_last_msg_ts, ws_last_error)
+  cached = _health_cache
+  if cached is None or _health_dirty or cached[0] != key:
+    _health_dirty = False  # cleared first: a mutation racing the rebuild re-dirties it
+    body = _jsonify(
+      connected=key[0],
+      last_msg_ts=key[1],
+      last_error=key[2],
       enabled=ws_status["enabled"],
       url=ws_status["url"],
-      subscribed=ws_status["subscribed"],
+      subscribed=dict(ws_status["subscribed"]),
       symbol=ws_status["symbol"],
       interval=ws_status["interval"],
       thread_alive=ws_status["thread_alive"],
-    )
+    ).get_data()
+    cached = _health_cache = (key, body)
+  return Response(cached[1], mimetype="application/json")
 
 @app.route("/api/ping")
 def api_ping():
-  return jsonify(ok=True, app=APP_NAME, version=APP_VERSION, ts=_now_ms())
+  return _jsonify(ok=True, app=APP_NAME, version=APP_VERSION, ts=_now_ms())
 
 @app.route("/api/candles")
 def api_candles():
-  symbol = request.args.get("symbol", DEFAULT_SYMBOL)
-  limit = int(request.args.get("limit", "100"))
-  _ensure_buffers(symbol)
-  out = [asdict(c) for c in list(candles[symbol])[-limit:]]
-  return jsonify(symbol=symbol, candles=out)
+  symbol, limit = _parse_tail_args(request.query_string)
+  # one snapshot, so every column comes from the same bars even while the WS thread pushes
+  snap = _snapshot(symbol)
+  # range() slicing keeps list[-limit:] semantics; build rows from the columns, no asdict()
+  k = len(range(len(snap[0]))[-limit:])
+  cols = [col[len(col) - k:].tolist() for col in snap]
+  out = [{"t": t, "o": o, "h": h, "l": l, "c": c, "v": v} for t, o, h, l, c, v in zip(*cols)]
+  return _jsonify(symbol=symbol, candles=out)
 
 
 # --- Recent trades endpoint ---
 @app.route("/api/trades")
 def api_trades():
-  symbol = request.args.get("symbol", DEFAULT_SYMBOL)
-  limit = int(request.args.get("limit", "100"))
-  _ensure_buffers(symbol)
-  out = list(trades[symbol])[-limit:]
-  return jsonify(symbol=symbol, trades=out)
+  symbol, limit = _parse_tail_args(request.query_string)
+  tbuf = _ensure_buffers(symbol)[1]
+  # range() slicing keeps list[-limit:] semantics; only the tail is converted
+  out = tbuf.tail(len(range(len(tbuf))[-limit:]))
+  return _jsonify(symbol=symbol, trades=out)
 
 @app.route("/api/volume-spikes")
 def api_volume_spikes():
-  symbol = request.args.get("symbol", DEFAULT_SYMBOL)
-  window = int(request.args.get("window", "20"))
-  multiplier = float(request.args.get("multiplier", "2.5"))
-  limit = int(request.args.get("limit", "20"))
+  symbol, window, multiplier, limit = _parse_spike_args(request.query_string)
   sp = compute_spikes(symbol, window=window, multiplier=multiplier, limit=limit)
-  return jsonify(symbol=symbol, window=window, multiplier=multiplier, spikes=sp)
+  return _jsonify(symbol=symbol, window=window, multiplier=multiplier, spikes=sp)
 
 
 # --- Endpoints index ---
-@app.route("/api/endpoints")
-def api_endpoints():
-  # Updated endpoints list: add /api/ws/subscribe and /api/ws/reconnect, new descriptions, and remove duplicate reconnect if present
-  endpoints=[
-    {"method":"GET","path":"/api/health","desc":"Websocket/health status"},
-    {"method":"GET","path":"/api/ping","desc":"Simple liveness check with version"},
-    {"method":"GET","path":"/api/candles?symbol=SYM&amp;limit=N","desc":"Recent candles"},
-    {"method":"GET","path":"/api/trades?symbol=SYM&amp;limit=N","desc":"Recent trades"},
-    {"method":"GET","path":"/api/volume-spikes?symbol=SYM&amp;window=W&amp;multiplier=M&amp;limit=N","desc":"Volume spike scan"},
-    {"method":"GET","path":"/api/signal/levels?symbol=SYM&amp;lookback=L","desc":"Recent range HH/LL and last close"},
-    {"method":"POST","path":"/api/signal/breakout","desc":"Breakout decision from spikes + range"},
-    {"method":"POST","path":"/api/signal/summary","desc":"Combined snapshot for spikes + breakout"},
-    {"method":"POST","path":"/api/bootstrap/candles","desc":"Seed candles from provided list or external URL"},
-    {"method":"GET","path":"/api/bootstrap/status","desc":"Counts of candles/trades for a symbol"},
-    {"method":"POST","path":"/api/position/suggest","desc":"Suggest position (direction, entry, SL, TP)"},
-    {"method":"POST","path":"/api/position/execute","desc":"Run suggest and open paper position with risk sizing"},
-    {"method":"POST","path":"/api/position/open","desc":"Open paper position"},
-    {"method":"POST","path":"/api/position/close","desc":"Close paper position (market)"},
-    {"method":"GET","path":"/api/positions?status=open","desc":"List paper positions with PnL (unrealized for open)"},
-    {"method":"POST","path":"/api/position/simulate","desc":"Size position by risk % (qty, notional, RR)"},
-    {"method":"POST","path":"/api/backtest","desc":"Backtest breakout+spike logic over recent candles"},
-    {"method":"POST","path":"/api/backtest/grid","desc":"Parameter sweep over (window,multiplier,lookback)"},
-    {"method":"GET","path":"/api/metrics","desc":"Portfolio/positions analytics (PnL, expectancy, drawdown, streaks)"},
-    {"method":"GET","path":"/api/strategy/presets","desc":"List built-in strategy presets"},
-    {"method":"POST","path":"/api/strategy/presets","desc":"Apply a preset to strategy config"},
-    {"method":"GET","path":"/api/config","desc":"Get default strategy params"},
-    {"method":"POST","path":"/api/config","desc":"Set default strategy params"},
-    {"method":"POST","path":"/api/ws/update","desc":"Update symbol/interval for WS (applies on next reconnect)"},
-    {"method":"POST","path":"/api/ws/subscribe","desc":"Update WS symbol/interval and reconnect now"},
-    {"method":"POST","path":"/api/ws/reconnect","desc":"Force-close socket to trigger reconnect"},
-    {"method":"POST","path":"/api/status/clear_error","desc":"Clear last error"},
-    {"method":"POST","path":"/api/order/market","desc":"Simulated market order (records filled)"},
-    {"method":"POST","path":"/api/order/limit","desc":"Simulated limit order with side &amp; auto-cancel"},
-    {"method":"GET","path":"/api/orders?status=open","desc":"List paper orders (optional status filter)"},
-    {"method":"POST","path":"/api/order/cancel","desc":"Cancel paper order by id (if open)"},
-    {"method":"POST","path":"/api/orders/reset","desc":"Clear paper orders"},
-    {"method":"POST","path":"/api/buffers/reset","desc":"Clear candle/trade buffers for a symbol"},
-    {"method":"POST","path":"/api/backtest/report?format=csv|json","desc":"Backtest + return CSV or JSON"}
-  ]
-  # Remove any duplicate /api/ws/reconnect entries (keep only the one with new description)
+ENDPOINTS = [
+  {"method":"GET","path":"/api/health","desc":"Websocket/health status"},
+  {"method":"GET","path":"/api/ping","desc":"Simple liveness check with version"},
+  {"method":"GET","path":"/api/candles?symbol=SYM&amp;limit=N","desc":"Recent candles"},
+  {"method":"GET","path":"/api/trades?symbol=SYM&amp;limit=N","desc":"Recent trades"},
+  {"method":"GET","path":"/api/volume-spikes?symbol=SYM&amp;window=W&amp;multiplier=M&amp;limit=N","desc":"Volume spike scan"},
+  {"method":"GET","path":"/api/signal/levels?symbol=SYM&amp;lookback=L","desc":"Recent range HH/LL and last close"},
+  {"method":"POST","path":"/api/signal/breakout","desc":"Breakout decision from spikes + range"},
+  {"method":"POST","path":"/api/signal/summary","desc":"Combined snapshot for spikes + breakout"},
+  {"method":"POST","path":"/api/bootstrap/candles","desc":"Seed candles from provided list or external URL"},
+  {"method":"GET","path":"/api/bootstrap/status","desc":"Counts of candles/trades for a symbol"},
+  {"method":"POST","path":"/api/position/suggest","desc":"Suggest position (direction, entry, SL, TP)"},
+  {"method":"POST","path":"/api/position/execute","desc":"Run suggest and open paper position with risk sizing"},
+  {"method":"POST","path":"/api/position/open","desc":"Open paper position"},
+  {"method":"POST","path":"/api/position/close","desc":"Close paper position (market)"},
+  {"method":"GET","path":"/api/positions?status=open","desc":"List paper positions with PnL (unrealized for open)"},
+  {"method":"POST","path":"/api/position/simulate","desc":"Size position by risk % (qty, notional, RR)"},
+  {"method":"POST","path":"/api/backtest","desc":"Backtest breakout+spike logic over recent candles"},
+  {"method":"POST","path":"/api/backtest/grid","desc":"Parameter sweep over (window,multiplier,lookback)"},
+  {"method":"GET","path":"/api/metrics","desc":"Portfolio/positions analytics (PnL, expectancy, drawdown, streaks)"},
+  {"method":"GET","path":"/api/strategy/presets","desc":"List built-in strategy presets"},
+  {"method":"POST","path":"/api/strategy/presets","desc":"Apply a preset to strategy config"},
+  {"method":"GET","path":"/api/config","desc":"Get default strategy params"},
+  {"method":"POST","path":"/api/config","desc":"Set default strategy params"},
+  {"method":"POST","path":"/api/config/preset","desc":"Apply a preset to strategy config (alias of POST /api/strategy/presets)"},
+  {"method":"POST","path":"/api/ws/update","desc":"Update symbol/interval for WS (applies on next reconnect)"},
+  {"method":"POST","path":"/api/ws/subscribe","desc":"Update WS symbol/interval and reconnect now"},
+  {"method":"POST","path":"/api/ws/reconnect","desc":"Force-close socket to trigger reconnect"},
+  {"method":"POST","path":"/api/status/clear_error","desc":"Clear last error"},
+  {"method":"POST","path":"/api/order/market","desc":"Simulated market order (records filled)"},
+  {"method":"POST","path":"/api/order/limit","desc":"Simulated limit order with side &amp; auto-cancel"},
+  {"method":"GET","path":"/api/orders?status=open","desc":"List paper orders (optional status filter)"},
+  {"method":"POST","path":"/api/order/cancel","desc":"Cancel paper order by id (if open)"},
+  {"method":"POST","path":"/api/orders/reset","desc":"Clear paper orders"},
+  {"method":"POST","path":"/api/buffers/reset","desc":"Clear candle/trade buffers for a symbol"},
+  {"method":"POST","path":"/api/backtest/report?format=csv|json","desc":"Backtest + return CSV or JSON"},
+  {"method":"POST","path":"/api/batch","desc":"Run several API sub-requests in one call"},
+]
+
+def _dedupe_endpoints(endpoints):
+  """Remove any duplicate (method, path) entries, keeping the first."""
   seen = set()
   endpoints_clean = []
   for ep in endpoints:
@@ -762,13 +1269,30 @@ def api_endpoints():
     if key not in seen:
       endpoints_clean.append(ep)
       seen.add(key)
-  return jsonify(endpoints=endpoints_clean)
+  return endpoints_clean
+
+_ENDPOINTS_JSON = _dumps({"endpoints": _dedupe_endpoints(ENDPOINTS)})
+_ENDPOINTS_ETAG = hashlib.sha1(_ENDPOINTS_JSON).hexdigest()
+
+@app.route("/api/endpoints")
+def api_endpoints():
+  return _static_response(_ENDPOINTS_JSON, _ENDPOINTS_ETAG, "application/json")
 # --- Bootstrap routes (seed candles) ---
 @app.route("/api/bootstrap/status")
 def api_bootstrap_status():
   symbol = request.args.get("symbol", DEFAULT_SYMBOL)
-  _ensure_buffers(symbol)
-  return jsonify(ok=True, symbol=symbol, candles=len(candles[symbol]), trades=len(trades[symbol]), requests_available=REQUESTS_AVAILABLE)
+  ring, tbuf = _ensure_buffers(symbol)
+  return _jsonify(ok=True, symbol=symbol, candles=len(ring), trades=len(tbuf), requests_available=REQUESTS_AVAILABLE)
+
+@lru_cache(maxsize=64)
+def _path_accessor(path: str):
+  """Compile a dotted json_path ("data.list") into a getter; empty segments are skipped."""
+  keys = tuple(k for k in path.split(".") if k)
+  def get(node):
+    for key in keys:
+      node = node.get(key, {})
+    return node
+  return get
 
 @app.route("/api/bootstrap/candles", methods=["POST"])
 def api_bootstrap_candles():
@@ -778,10 +1302,10 @@ def api_bootstrap_candles():
   - OR body contains {"url":"https://...", "symbol":"...", "json_path":"data"} to fetch from an external URL (if requests available).
   Any parse errors are skipped.
   """
-  data = request.get_json(silent=True) or {}
+  data = _body()
   symbol = data.get("symbol", DEFAULT_SYMBOL)
   replace = bool(data.get("replace", False))
-  _ensure_buffers(symbol)
+  ring = _ensure_buffers(symbol)[0]
 
   inserted = 0
   used_url = None
@@ -791,35 +1315,30 @@ def api_bootstrap_candles():
     seq = []
     for r in rows:
       try:
-        seq.append(Candle(
-          t=int(r.get("t")),
-          o=float(r.get("o")), h=float(r.get("h")), l=float(r.get("l")),
-          c=float(r.get("c")), v=float(r.get("v"))
+        seq.append((
+          int(r.get("t")),
+          _fast_float(r.get("o")), _fast_float(r.get("h")), _fast_float(r.get("l")),
+          _fast_float(r.get("c")), _fast_float(r.get("v"))
         ))
       except Exception:
         continue
-    if replace:
-      candles[symbol].clear()
-    for cndl in seq:
-      candles[symbol].append(cndl)
+    with buffer_lock:
+      if replace:
+        ring.clear()
+      ring.extend(seq)
     inserted = len(seq)
 
   elif data.get("url"):
     if not REQUESTS_AVAILABLE:
-      return jsonify(ok=False, reason="requests not available"), 400
+      return _jsonify(ok=False, reason="requests not available"), 400
     url = str(data.get("url"))
     used_url = url
     try:
-      resp = requests.get(url, timeout=10)
+      resp = _http.get(url, timeout=10)
       resp.raise_for_status()
       payload = resp.json()
       json_path = data.get("json_path")  # e.g., "data.list"
-      node = payload
-      if json_path:
-        for key in str(json_path).split("."):
-          if key == "":
-            continue
-          node = node.get(key, {})
+      node = _path_accessor(str(json_path))(payload) if json_path else payload
       rows = node if isinstance(node, list) else []
       seq = []
       for r in rows:
@@ -833,45 +1352,46 @@ def api_bootstrap_candles():
         if None in (t,o,h,l,c,v):
           continue
         try:
-          seq.append(Candle(t=int(t), o=float(o), h=float(h), l=float(l), c=float(c), v=float(v)))
+          seq.append((int(t), _fast_float(o), _fast_float(h), _fast_float(l),
+                      _fast_float(c), _fast_float(v)))
         except Exception:
           continue
-      if replace:
-        candles[symbol].clear()
-      for cndl in seq:
-        candles[symbol].append(cndl)
+      with buffer_lock:
+        if replace:
+          ring.clear()
+        ring.extend(seq)
       inserted = len(seq)
     except Exception as e:
-      return jsonify(ok=False, reason=f"fetch failed: {e}")
+      return _jsonify(ok=False, reason=f"fetch failed: {e}")
   else:
-    return jsonify(ok=False, reason="provide candles[] or url"), 400
+    return _jsonify(ok=False, reason="provide candles[] or url"), 400
 
-  return jsonify(ok=True, symbol=symbol, inserted=inserted, url=used_url, total=len(candles[symbol]))
+  return _jsonify(ok=True, symbol=symbol, inserted=inserted, url=used_url, total=len(ring))
 # --- Position sizing utility ---
 @app.route("/api/position/simulate", methods=["POST"])
 def api_position_simulate():
-  data = request.get_json(silent=True) or {}
+  data = _body()
   entry = float(data.get("entry", 0))
   sl = float(data.get("sl", 0))
   balance = float(data.get("balance", 0))
   risk_pct = float(data.get("risk_pct", 0.01))
   leverage = float(data.get("leverage", 1))
   if entry <= 0 or sl <= 0 or balance <= 0 or risk_pct <= 0:
-    return jsonify(ok=False, reason="entry, sl, balance, risk_pct required and > 0"), 400
+    return _jsonify(ok=False, reason="entry, sl, balance, risk_pct required and > 0"), 400
   risk_amt = balance * risk_pct
   per_unit_risk = abs(entry - sl)
   if per_unit_risk == 0:
-    return jsonify(ok=False, reason="entry and sl cannot be equal"), 400
+    return _jsonify(ok=False, reason="entry and sl cannot be equal"), 400
   qty = risk_amt / per_unit_risk
   notional = qty * entry
   rr15 = 1.5  # matches breakout TP sizing
   tp = entry + rr15 * (entry - sl) if entry > sl else entry - rr15 * (sl - entry)
-  return jsonify(ok=True, qty=qty, notional=notional, tp=tp, risk_amount=risk_amt, per_unit_risk=per_unit_risk, leverage=leverage)
+  return _jsonify(ok=True, qty=qty, notional=notional, tp=tp, risk_amount=risk_amt, per_unit_risk=per_unit_risk, leverage=leverage)
 
 # --- Positions (paper) ---
 @app.route("/api/position/open", methods=["POST"])
 def api_position_open():
-  data = request.get_json(silent=True) or {}
+  data = _body()
   symbol = data.get("symbol", DEFAULT_SYMBOL)
   side = str(data.get("side", "long")).lower()
   entry = float(data.get("entry"))
@@ -880,7 +1400,7 @@ def api_position_open():
   tp = float(data.get("tp"))
   leverage = float(data.get("leverage", 1))
   if not all([symbol, entry, qty, sl, tp]):
-    return jsonify(ok=False, reason="symbol, entry, qty, sl, tp required"), 400
+    return _jsonify(ok=False, reason="symbol, entry, qty, sl, tp required"), 400
   pid = _gen_id("POS")
   pos = {
     "id": pid, "symbol": symbol, "side": "long" if side != "short" else "short",
@@ -888,40 +1408,39 @@ def api_position_open():
     "status": "open", "created_at": _now_ms(), "updated_at": _now_ms(),
     "exit": None, "closed_at": None, "realized_pnl": 0.0
   }
-  with position_lock:
-    positions[pid] = pos
-  return jsonify(ok=True, position=pos)
+  positions.put(pid, pos)
+  return _jsonify(ok=True, position=pos)
 
 @app.route("/api/position/close", methods=["POST"])
 def api_position_close():
-  data = request.get_json(silent=True) or {}
+  data = _body()
   pid = data.get("position_id")
   price = data.get("price")
   if not pid:
-    return jsonify(ok=False, reason="position_id required"), 400
-  with position_lock:
-    p = positions.get(pid)
+    return _jsonify(ok=False, reason="position_id required"), 400
+  lock, shard = positions.shard(pid)
+  with lock:
+    p = shard.get(pid)
     if not p:
-      return jsonify(ok=False, reason="position not found"), 404
+      return _jsonify(ok=False, reason="position not found"), 404
     if p["status"] != "open":
-      return jsonify(ok=False, reason=f"position is {p['status']}"), 409
+      return _jsonify(ok=False, reason=f"position is {p['status']}"), 409
     mkt = float(price) if price is not None else _last_close(p["symbol"])
     if mkt <= 0:
-      return jsonify(ok=False, reason="no price available to close"), 400
+      return _jsonify(ok=False, reason="no price available to close"), 400
     # Realized PnL (simple, no fees)
     if p["side"] == "long":
       pnl = (mkt - p["entry"]) * p["qty"]
     else:
       pnl = (p["entry"] - mkt) * p["qty"]
     p.update({"status":"closed","exit":mkt,"closed_at":_now_ms(),"updated_at":_now_ms(),"realized_pnl":pnl})
-  return jsonify(ok=True, position=p)
+  return _jsonify(ok=True, position=p)
 
 @app.route("/api/positions")
 def api_positions():
   status = request.args.get("status")
   sym = request.args.get("symbol")
-  with position_lock:
-    vals = list(positions.values())
+  vals = positions.values()
   if status:
     vals = [p for p in vals if p.get("status") == status]
   if sym:
@@ -942,7 +1461,7 @@ def api_positions():
       pcopy["unrealized_pnl"] = upnl
       pcopy["mark"] = last
     out.append(pcopy)
-  return jsonify(ok=True, positions=out, count=len(out))
+  return _jsonify(ok=True, positions=out, count=len(out))
 
 # --- Execute wrapper: run suggest, size, and open ---
 @app.route("/api/position/execute", methods=["POST"])
@@ -951,7 +1470,7 @@ def api_position_execute():
   Run /api/position/suggest; if ok, size the trade by balance & risk_pct, then open a paper position.
   Body: {"symbol":"BTCUSDT","balance":1000,"risk_pct":0.01,"leverage":5, overrides...}
   """
-  data = request.get_json(silent=True) or {}
+  data = _body()
   symbol = data.get("symbol", DEFAULT_SYMBOL)
   balance = float(data.get("balance", 0))
   risk_pct = float(data.get("risk_pct", 0.01))
@@ -964,7 +1483,7 @@ def api_position_execute():
   # get suggestion
   sig = breakout_signal(symbol, lookback=lookback, window=window, multiplier=multiplier)
   if not sig.get("hasSignal"):
-    return jsonify(ok=False, reason=sig.get("reason","no signal"), suggestion=sig), 409
+    return _jsonify(ok=False, reason=sig.get("reason","no signal"), suggestion=sig), 409
 
   entry, sl, tp = float(sig["entry"]), float(sig["sl"]), float(sig["tp"])
   # sizing
@@ -973,7 +1492,7 @@ def api_position_execute():
   risk_amt = balance * risk_pct
   per_unit_risk = abs(entry - sl)
   if per_unit_risk <= 0:
-    return jsonify(ok=False, reason="invalid entry/sl for sizing", suggestion=sig), 400
+    return _jsonify(ok=False, reason="invalid entry/sl for sizing", suggestion=sig), 400
   qty = risk_amt / per_unit_risk
   side = "long" if sig["direction"] == "long" else "short"
 
@@ -985,33 +1504,32 @@ def api_position_execute():
     "created_at": _now_ms(), "updated_at": _now_ms(),
     "exit": None, "closed_at": None, "realized_pnl": 0.0
   }
-  with position_lock:
-    positions[pid] = pos
+  positions.put(pid, pos)
 
-  return jsonify(ok=True, opened=pos, suggestion=sig, sizing={"qty": qty, "risk_amount": risk_amt})
+  return _jsonify(ok=True, opened=pos, suggestion=sig, sizing={"qty": qty, "risk_amount": risk_amt})
 # --- Maintenance endpoints ---
 @app.route("/api/orders/reset", methods=["POST"])
 def api_orders_reset():
-  with order_lock:
-    paper_orders.clear()
-  return jsonify(ok=True, message="orders cleared")
+  paper_orders.clear()
+  return _jsonify(ok=True, message="orders cleared")
 
 @app.route("/api/buffers/reset", methods=["POST"])
 def api_buffers_reset():
-  data = request.get_json(silent=True) or {}
+  data = _body()
   symbol = data.get("symbol", DEFAULT_SYMBOL)
-  _ensure_buffers(symbol)
-  candles[symbol].clear()
-  trades[symbol].clear()
-  return jsonify(ok=True, symbol=symbol, message="buffers cleared")
+  ring, tbuf = _ensure_buffers(symbol)
+  with buffer_lock:
+    ring.clear()
+  tbuf.clear()
+  return _jsonify(ok=True, symbol=symbol, message="buffers cleared")
 
 @app.route("/api/ws/reconnect", methods=["POST"])
 def api_ws_reconnect():
   """Request an immediate reconnect by closing the active socket if present."""
-  with state_lock:
-    ws_status["last_error"] = "manual reconnect requested"
+  global ws_last_error
+  ws_last_error = "manual reconnect requested"
   _ws_close()
-  return jsonify(ok=True, message="Reconnect requested. Closing current WS to force reconnect.")
+  return _jsonify(ok=True, message="Reconnect requested. Closing current WS to force reconnect.")
 
 # --- Update symbol/interval and force immediate resubscribe ---
 @app.route("/api/ws/subscribe", methods=["POST"])
@@ -1020,25 +1538,27 @@ def api_ws_subscribe():
   Update symbol/interval and immediately reconnect WS to apply changes.
   Body: {"symbol":"BTCUSDT","interval":"market_kline_1min"}
   """
-  data = request.get_json(silent=True) or {}
+  global ws_last_error
+  data = _body()
   symbol = data.get("symbol", DEFAULT_SYMBOL)
   interval = data.get("interval", DEFAULT_INTERVAL)
   with state_lock:
     ws_status["symbol"] = symbol
     ws_status["interval"] = interval
-    ws_status["last_error"] = "subscribe requested; applying on reconnect"
+    _status_changed()
+  ws_last_error = "subscribe requested; applying on reconnect"
   _ws_close()
-  return jsonify(ok=True, message="Updated WS subscription and closing current socket to apply.", symbol=symbol, interval=interval)
+  return _jsonify(ok=True, message="Updated WS subscription and closing current socket to apply.", symbol=symbol, interval=interval)
 
 @app.route("/api/signal/breakout", methods=["POST"])
 def api_signal_breakout():
-  data = request.get_json(silent=True) or {}
+  data = _body()
   symbol = data.get("symbol", DEFAULT_SYMBOL)
   window = int(data.get("window", strategy_cfg["window"]))
   multiplier = float(data.get("multiplier", strategy_cfg["multiplier"]))
   lookback = int(data.get("lookback", strategy_cfg["lookback"]))
   sig = breakout_signal(symbol, lookback=lookback, window=window, multiplier=multiplier)
-  return jsonify(sig)
+  return _jsonify(sig)
 
 
 # --- Levels endpoint: expose recent range levels ---
@@ -1046,34 +1566,31 @@ def api_signal_breakout():
 def api_signal_levels():
   symbol = request.args.get("symbol", DEFAULT_SYMBOL)
   lookback = int(request.args.get("lookback", strategy_cfg["lookback"]))
-  _ensure_buffers(symbol)
-  buf = list(candles[symbol])
-  if len(buf) < lookback + 1:
-    return jsonify(ok=False, reason="insufficient candles", symbol=symbol, lookback=lookback)
-  rng = buf[-lookback:]
-  hh = max(c.h for c in rng[:-1])  # exclude current candle
-  ll = min(c.l for c in rng[:-1])
-  cur = buf[-1]
-  return jsonify(ok=True, symbol=symbol, lookback=lookback, hh=hh, ll=ll, last_close=cur.c)
+  _, _, h, l, c, _ = _snapshot(symbol)
+  # lookback <= 0 spans the whole buffer, which still needs a bar before the current one
+  if len(c) < max(lookback, 1) + 1:
+    return _jsonify(ok=False, reason="insufficient candles", symbol=symbol, lookback=lookback)
+  hh, ll = _prior_levels(h, l, lookback)  # exclude current candle
+  return _jsonify(ok=True, symbol=symbol, lookback=lookback, hh=hh, ll=ll, last_close=float(c[-1]))
 
 
 # --- Combined summary route ---
 @app.route("/api/signal/summary", methods=["POST"])
 def api_signal_summary():
-  data = request.get_json(silent=True) or {}
+  data = _body()
   symbol = data.get("symbol", DEFAULT_SYMBOL)
   window = int(data.get("window", 20))
   multiplier = float(data.get("multiplier", 2.5))
   lookback = int(data.get("lookback", 20))
   sp = compute_spikes(symbol, window=window, multiplier=multiplier, limit=10)
   sig = breakout_signal(symbol, lookback=lookback, window=window, multiplier=multiplier)
-  return jsonify(symbol=symbol, spikes=sp, breakout=sig)
+  return _jsonify(symbol=symbol, spikes=sp, breakout=sig)
 
 
 # --- Position suggestion route ---
 @app.route("/api/position/suggest", methods=["POST"])
 def api_position_suggest():
-  data = request.get_json(silent=True) or {}
+  data = _body()
   symbol = data.get("symbol", DEFAULT_SYMBOL)
   window = int(data.get("window", strategy_cfg["window"]))
   multiplier = float(data.get("multiplier", strategy_cfg["multiplier"]))
@@ -1083,16 +1600,13 @@ def api_position_suggest():
   sig = breakout_signal(symbol, lookback=lookback, window=window, multiplier=multiplier)
   if not sig.get("hasSignal"):
     # Return levels even if no immediate signal
-    _ensure_buffers(symbol)
-    buf = list(candles[symbol])
-    if len(buf) < lookback + 1:
-      return jsonify(ok=False, reason="insufficient candles for suggestion", symbol=symbol)
-    rng = buf[-lookback:]
-    hh = max(c.h for c in rng[:-1])
-    ll = min(c.l for c in rng[:-1])
-    return jsonify(ok=False, reason=sig.get("reason","no signal"), symbol=symbol, hh=hh, ll=ll, last_close=buf[-1].c)
-
-  return jsonify(ok=True, symbol=symbol, suggestion={
+    _, _, h, l, c, _ = _snapshot(symbol)
+    if len(c) < max(lookback, 1) + 1:
+      return _jsonify(ok=False, reason="insufficient candles for suggestion", symbol=symbol)
+    hh, ll = _prior_levels(h, l, lookback)
+    return _jsonify(ok=False, reason=sig.get("reason","no signal"), symbol=symbol, hh=hh, ll=ll, last_close=float(c[-1]))
+
+  return _jsonify(ok=True, symbol=symbol, suggestion={
     "direction": sig["direction"],
     "entry": sig["entry"],
     "sl": sig["sl"],
@@ -1115,7 +1629,11 @@ def api_backtest():
     - if breakout and spike ratio >= multiplier, enter at close_i,
     - resolve over the next N bars (default 10): first touch of TP or SL wins.
   """
-  data = request.get_json(silent=True) or {}
+  params = _backtest_params(_body())
+  return _jsonify(_backtest_core(_snapshot(params[0]), *params))
+
+def _backtest_params(data: dict) -> tuple:
+  """Backtest knobs from a request body, in _backtest_core's (symbol, window, ...) order."""
   symbol = data.get("symbol", DEFAULT_SYMBOL)
   window = int(data.get("window", strategy_cfg["window"]))
   multiplier = float(data.get("multiplier", strategy_cfg["multiplier"]))
@@ -1125,130 +1643,99 @@ def api_backtest():
   tie_breaker = str(data.get("tie_breaker", "sl_wins")).lower()  # "sl_wins" | "tp_wins"
   fee_bps = float(data.get("fee_bps", 0.0))  # round-trip fee in basis points, e.g., 10 = 0.10%
   slippage = float(data.get("slippage", 0.0))  # absolute price slippage per fill
+  return symbol, window, multiplier, lookback, resolve_bars, max_trades, tie_breaker, fee_bps, slippage
 
-  _ensure_buffers(symbol)
-  buf = list(candles[symbol])
-  n = len(buf)
+def _backtest_core(cols, symbol, window, multiplier, lookback, resolve_bars, max_trades,
+                   tie_breaker, fee_bps, slippage) -> dict:
+  """Backtest over snapshot columns (see _snapshot); returns the /api/backtest payload as a dict."""
+  t_arr, _, h_arr, l_arr, c_arr, v_arr = cols
+  n = len(t_arr)
   if n < max(lookback + 1, window + 1, resolve_bars + 2):
-    return jsonify(ok=False, reason="insufficient candles", available=n)
-
-  # helper: compute spike on a slice ending at idx i (inclusive)
-  def last_spike_ratio(up_to_idx: int):
-    start = max(0, up_to_idx - (window))
-    prev_start = max(0, up_to_idx - (window * 2))
-    prev = buf[prev_start:up_to_idx - window + 1] if (up_to_idx - window) - prev_start + 1 > 0 else []
-    if len(prev) < window:
-      prev = buf[start:up_to_idx]  # fallback to immediate window
-    if len(prev) == 0:
-      return 0.0
-    avg_v = sum(c.v for c in prev) / float(len(prev))
-    cur = buf[up_to_idx]
-    return (cur.v / avg_v) if avg_v > 0 else 0.0
-
-  trades = []
+    return {"ok": False, "reason": "insufficient candles", "available": n}
+
   # iterate over recent region only
   i_start = max(lookback + 1, window + 1)
   i_end = n - resolve_bars - 1
   if i_end <= i_start:
-    return jsonify(ok=False, reason="not enough forward bars to resolve")
-
-  indices = list(range(i_start, i_end))
-  if len(indices) > max_trades:
-    indices = indices[-max_trades:]
-
-  for i in indices:
-    prior = buf[i - lookback:i]
-    if len(prior) < lookback:
-      continue
-    hh = max(c.h for c in prior[:-1])
-    ll = min(c.l for c in prior[:-1])
-    cur = buf[i]
-    ratio = last_spike_ratio(i)
-
-    direction = None
-    if cur.c > hh and ratio >= multiplier:
-      direction = "long"
-    elif cur.c < ll and ratio >= multiplier:
-      direction = "short"
-
-    if not direction:
-      continue
-
-    entry = cur.c
-    # ATR-lite using candle range
-    rng = cur.h - cur.l
-    if direction == "long":
-      sl = max(ll, entry - rng)
-      risk = entry - sl
-      tp = entry + 1.5 * risk
-    else:
-      sl = min(hh, entry + rng)
-      risk = sl - entry
-      tp = entry - 1.5 * risk
-
-    outcome = None
-    bars_used = 0
-    # walk forward resolve_bars candles to see which is hit first
-    for j in range(i + 1, min(n, i + 1 + resolve_bars)):
-      bars_used += 1
-      hi = buf[j].h
-      lo = buf[j].l
-      if direction == "long":
-        hit_tp = hi >= tp
-        hit_sl = lo <= sl
-      else:
-        hit_tp = lo <= tp
-        hit_sl = hi >= sl
-      if hit_tp and hit_sl:
-        if tie_breaker == "tp_wins":
-          outcome = "win"
-        else:
-          outcome = "loss"
-        break
-      if hit_tp:
-        outcome = "win"
-        break
-      if hit_sl:
-        outcome = "loss"
-        break
-    if outcome is None:
-      outcome = "open"
-
-    # Adjust entry/exit for slippage and fees
-    exec_entry = entry + (slippage if direction == "long" else -slippage)
-    if outcome == "win":
-      exec_exit = tp - (slippage if direction == "long" else -slippage)
-    elif outcome == "loss":
-      exec_exit = sl - (slippage if direction == "long" else -slippage)
-    else:
-      exec_exit = buf[i + bars_used].c if bars_used > 0 else entry
-    notional_entry = exec_entry
-    notional_exit = exec_exit
-    fee_mult = (1.0 - fee_bps / 10000.0)
-    if direction == "long":
-      unit_pnl = (notional_exit - notional_entry) * fee_mult
-    else:
-      unit_pnl = (notional_entry - notional_exit) * fee_mult
-
-    trades.append({
+    return {"ok": False, "reason": "not enough forward bars to resolve"}
+
+  idx = np.arange(i_start, i_end)
+  if len(idx) > max_trades:
+    idx = idx[-max_trades:]
+
+  # HH/LL over the prior lookback bars, excluding the bar just before i: candles[i-lookback:i-1]
+  hh_all = sliding_window_view(h_arr, lookback - 1).max(axis=1)[idx - lookback]
+  ll_all = sliding_window_view(l_arr, lookback - 1).min(axis=1)[idx - lookback]
+
+  # Spike ratio: mean volume of candles[max(0, i-2w):i-w+1] when that holds >= window
+  # bars, otherwise of the immediate window candles[i-w:i].
+  prev_start = np.maximum(idx - 2 * window, 0)
+  prev_len = np.maximum(idx - window + 1 - prev_start, 0)
+  use_prev = prev_len >= window
+  a = np.where(use_prev, prev_start, np.maximum(idx - window, 0))
+  span = np.where(use_prev, prev_len, idx - a)
+  # summed bar by bar in slice order, so sums match the sequential sum() bit for bit
+  vsum = np.zeros(len(idx))
+  for k in range(int(span.max()) if len(span) else 0):
+    vsum += np.where(k < span, v_arr[np.minimum(a + k, n - 1)], 0.0)
+  avg_v = np.zeros(len(idx))
+  np.divide(vsum, span, out=avg_v, where=span > 0)
+  ratio_all = np.zeros(len(idx))
+  np.divide(v_arr[idx], avg_v, out=ratio_all, where=avg_v > 0)
+
+  close = c_arr[idx]
+  spiked = ratio_all >= multiplier
+  long_sig = (close > hh_all) & spiked
+  short_sig = ~long_sig & (close < ll_all) & spiked
+  sel = long_sig | short_sig
+  ti = idx[sel]
+  is_long = long_sig[sel]
+  hh, ll, ratio = hh_all[sel], ll_all[sel], ratio_all[sel]
+
+  entry = c_arr[ti]
+  # ATR-lite using candle range
+  rng = h_arr[ti] - l_arr[ti]
+  sl = np.where(is_long, np.maximum(ll, entry - rng), np.minimum(hh, entry + rng))
+  risk = np.where(is_long, entry - sl, sl - entry)
+  tp = np.where(is_long, entry + 1.5 * risk, entry - 1.5 * risk)
+
+  # walk forward resolve_bars candles: the first bar touching TP or SL decides
+  win, loss, bars_used = _resolve_trades(h_arr, l_arr, ti, tp, sl, is_long, resolve_bars,
+                                         tie_breaker == "tp_wins")
+
+  # Adjust entry/exit for slippage and fees
+  slip = np.where(is_long, slippage, -slippage)
+  exec_entry = entry + slip
+  exec_exit = np.where(win, tp - slip, np.where(loss, sl - slip, c_arr[ti + bars_used]))
+  fee_mult = (1.0 - fee_bps / 10000.0)
+  unit_pnl = np.where(is_long, exec_exit - exec_entry, exec_entry - exec_exit) * fee_mult
+
+  outcomes = np.where(win, "win", np.where(loss, "loss", "open")).tolist()
+  trades = [
+    {
       "i": i,
-      "t": cur.t,
-      "direction": direction,
-      "entry": round(entry, 8),
-      "sl": round(sl, 8),
-      "tp": round(tp, 8),
-      "spike_ratio": round(ratio, 3),
-      "hh": hh,
-      "ll": ll,
-      "bars_to_resolve": bars_used,
-      "outcome": outcome,
-      "exec_entry": round(exec_entry, 8),
-      "exec_exit": round(exec_exit, 8),
-      "unit_pnl": round(unit_pnl, 8),
+      "t": t,
+      "direction": "long" if lg else "short",
+      "entry": e,
+      "sl": s,
+      "tp": p,
+      "spike_ratio": r,
+      "hh": h,
+      "ll": lo,
+      "bars_to_resolve": b,
+      "outcome": o,
+      "exec_entry": xe,
+      "exec_exit": xx,
+      "unit_pnl": u,
       "tie_breaker": tie_breaker,
       "fee_bps": fee_bps,
       "slippage": slippage,
-    })
+    }
+    for i, t, lg, e, s, p, r, h, lo, b, o, xe, xx, u in zip(
+      ti.tolist(), t_arr[ti].tolist(), is_long.tolist(), _round_col(entry, 8), _round_col(sl, 8), _round_col(tp, 8),
+      _round_col(ratio, 3), hh.tolist(), ll.tolist(), bars_used.tolist(), outcomes,
+      _round_col(exec_entry, 8), _round_col(exec_exit, 8), _round_col(unit_pnl, 8))
+  ]
 
   # aggregate stats
   wins = sum(1 for t in trades if t["outcome"] == "win")
@@ -1260,14 +1747,16 @@ def api_backtest():
   avg_loss = (sum(t["unit_pnl"] for t in trades if t["outcome"]=="loss") / losses) if losses else 0.0
   expectancy = (wins/total)*avg_win + (losses/total)*avg_loss if total else 0.0
 
-  return jsonify(ok=True, symbol=symbol, params={
+  return {
+    "ok": True, "symbol": symbol,
+    "params": {
       "window": window, "multiplier": multiplier, "lookback": lookback,
       "resolve_bars": resolve_bars, "max_trades": max_trades
     },
-    summary={"total": total, "wins": wins, "losses": losses, "open": opens, "win_rate": round(win_rate, 4),
-             "avg_win": round(avg_win, 8), "avg_loss": round(avg_loss, 8), "expectancy": round(expectancy, 8)},
-    trades=trades
-  )
+    "summary": {"total": total, "wins": wins, "losses": losses, "open": opens, "win_rate": round(win_rate, 4),
+                "avg_win": round(avg_win, 8), "avg_loss": round(avg_loss, 8), "expectancy": round(expectancy, 8)},
+    "trades": trades,
+  }
 
 # --- Parameter sweep over grid of (window, multiplier, lookback) ---
 @app.route("/api/backtest/grid", methods=["POST"])
@@ -1282,7 +1771,7 @@ def api_backtest_grid():
     {"window":{"start":5,"stop":20,"step":5}, ...}
   Returns top 10 by expectancy then win_rate.
   """
-  data = request.get_json(silent=True) or {}
+  data = _body()
   symbol = data.get("symbol", DEFAULT_SYMBOL)
   def _expand(v, default):
     if isinstance(v, dict):
@@ -1300,104 +1789,91 @@ def api_backtest_grid():
   fee_bps = float(data.get("fee_bps", 0.0))
   slippage = float(data.get("slippage", 0.0))
 
+  # one snapshot for the whole sweep; each cell runs the core directly
+  cols = _snapshot(symbol)
   results = []
-  for w in windows:
-    for m in mults:
-      for l in looks:
-        req = {"symbol": symbol, "window": int(w), "multiplier": float(m), "lookback": int(l),
-               "resolve_bars": resolve_bars, "max_trades": max_trades,
-               "tie_breaker": tie_breaker, "fee_bps": fee_bps, "slippage": slippage}
-        with app.test_request_context(json=req):
-          res = api_backtest()
-          js = res.get_json()
-        if not js or not js.get("ok"):
-          continue
-        summ = js["summary"]
-        results.append({
-          "window": int(w), "multiplier": float(m), "lookback": int(l),
-          "total": summ["total"], "wins": summ["wins"], "losses": summ["losses"],
-          "win_rate": summ["win_rate"], "expectancy": summ.get("expectancy", 0.0),
-          "avg_win": summ.get("avg_win", 0.0), "avg_loss": summ.get("avg_loss", 0.0)
-        })
-  # sort by expectancy then win_rate then total trades
-  results.sort(key=lambda r: (r["expectancy"], r["win_rate"], r["total"]), reverse=True)
-  top = results[:10]
-  return jsonify(ok=True, symbol=symbol, tried=len(results), top=top)
+  # coerce each axis once, then walk the flattened (window, multiplier, lookback) product
+  for w, m, l in itertools.product([int(x) for x in windows], [float(x) for x in mults], [int(x) for x in looks]):
+    js = _backtest_core(cols, symbol, w, m, l, resolve_bars, max_trades, tie_breaker, fee_bps, slippage)
+    if not js.get("ok"):
+      continue
+    summ = js["summary"]
+    results.append({
+      "window": w, "multiplier": m, "lookback": l,
+      "total": summ["total"], "wins": summ["wins"], "losses": summ["losses"],
+      "win_rate": summ["win_rate"], "expectancy": summ.get("expectancy", 0.0),
+      "avg_win": summ.get("avg_win", 0.0), "avg_loss": summ.get("avg_loss", 0.0)
+    })
+  # rank by expectancy then win_rate then total trades, all descending; lexsort is stable,
+  # so ties keep sweep order just like a reverse sort would
+  keys = np.array([(r["expectancy"], r["win_rate"], r["total"]) for r in results], dtype=np.float64).reshape(-1, 3)
+  order = np.lexsort(-keys.T[::-1])
+  top = [results[i] for i in order[:10].tolist()]
+  return _jsonify(ok=True, symbol=symbol, tried=len(results), top=top)
 # --- Portfolio/positions analytics (PnL, expectancy, drawdown, streaks) ---
+def _max_run(mask) -> int:
+  """Length of the longest run of True in a bool array."""
+  if not mask.any():
+    return 0
+  edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+  return int((np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)).max())
+
 @app.route("/api/metrics")
 def api_metrics():
-  # Build equity curve from closed positions by created_at order
-  with position_lock:
-    closed = sorted([p for p in positions.values() if p.get("status")=="closed"], key=lambda x: x["closed_at"] or x["created_at"])
-  eq = [0.0]
-  max_eq = 0.0
-  dd = 0.0
-  max_dd = 0.0
-  wins = losses = 0
-  win_streak = loss_streak = 0
-  max_win_streak = max_loss_streak = 0
-  pnl_list = []
-  for p in closed:
-    pnl = float(p.get("realized_pnl", 0.0))
-    pnl_list.append(pnl)
-    eq.append(eq[-1] + pnl)
-    max_eq = max(max_eq, eq[-1])
-    dd = max_eq - eq[-1]
-    max_dd = max(max_dd, dd)
-    if pnl > 0:
-      wins += 1
-      win_streak += 1
-      loss_streak = 0
-      max_win_streak = max(max_win_streak, win_streak)
-    elif pnl < 0:
-      losses += 1
-      loss_streak += 1
-      win_streak = 0
-      max_loss_streak = max(max_loss_streak, loss_streak)
-    else:
-      # flat pnl
-      win_streak = 0
-      loss_streak = 0
+  # Build equity curve from closed positions by close (else created_at) order;
+  # only (time, pnl) columns are taken from the store, the rest is array math
+  closed = [p for p in positions.values() if p.get("status")=="closed"]
   total = len(closed)
-  avg_win = (sum(p for p in pnl_list if p > 0)/wins) if wins else 0.0
-  avg_loss = (sum(p for p in pnl_list if p < 0)/losses) if losses else 0.0
+  ts = np.fromiter((p["closed_at"] or p["created_at"] for p in closed), dtype=np.int64, count=total)
+  pnls = np.fromiter((float(p.get("realized_pnl", 0.0)) for p in closed), dtype=np.float64, count=total)
+  pnls = pnls[np.argsort(ts, kind="stable")]
+  eq = np.cumsum(pnls)
+  # peak equity starts at 0 (the curve's origin), so early losses count as drawdown
+  max_dd = float((np.maximum.accumulate(np.maximum(eq, 0.0)) - eq).max()) if total else 0.0
+  won, lost = pnls > 0, pnls < 0
+  wins, losses = int(won.sum()), int(lost.sum())
+  # a flat pnl breaks both streaks, which run lengths over each mask give for free
+  max_win_streak, max_loss_streak = _max_run(won), _max_run(lost)
+  avg_win = (sum(pnls[won].tolist())/wins) if wins else 0.0
+  avg_loss = (sum(pnls[lost].tolist())/losses) if losses else 0.0
   win_rate = (wins/total) if total else 0.0
   expectancy = (wins/total)*avg_win + (losses/total)*avg_loss if total else 0.0
-  return jsonify(ok=True, summary={
+  return _jsonify(ok=True, summary={
     "trades": total,
     "wins": wins, "losses": losses, "win_rate": round(win_rate, 4),
     "avg_win": round(avg_win, 8), "avg_loss": round(avg_loss, 8),
     "expectancy": round(expectancy, 8),
     "max_drawdown": round(max_dd, 8),
     "max_win_streak": max_win_streak, "max_loss_streak": max_loss_streak,
-    "final_equity": round(eq[-1], 8)
+    "final_equity": round(float(eq[-1]) if total else 0.0, 8)
   })
 
 @app.route("/api/ws/update", methods=["POST"])
 def api_ws_update():
-  data = request.get_json(silent=True) or {}
+  data = _body()
   symbol = data.get("symbol", DEFAULT_SYMBOL)
   interval = data.get("interval", DEFAULT_INTERVAL)
   with state_lock:
     ws_status["symbol"] = symbol
     ws_status["interval"] = interval
-  return jsonify(ok=True, message="WS config updated. Will apply on next reconnect.", symbol=symbol, interval=interval)
+    _status_changed()
+  return _jsonify(ok=True, message="WS config updated. Will apply on next reconnect.", symbol=symbol, interval=interval)
 
 @app.route("/api/status/clear_error", methods=["POST"])
 def api_clear_error():
-  with state_lock:
-    ws_status["last_error"] = None
-  return jsonify(ok=True, message="Last error cleared.")
+  global ws_last_error
+  ws_last_error = None
+  return _jsonify(ok=True, message="Last error cleared.")
 
 # --- Simulated orders (paper) ---
 
 @app.route("/api/order/market", methods=["POST"])
 def api_order_market():
-  data = request.get_json(silent=True) or {}
+  data = _body()
   symbol = data.get("symbol", DEFAULT_SYMBOL)
   side = str(data.get("side", "buy")).lower()
   qty = float(data.get("qty", 1))
-  order_id = f"SIM-MKT-{_now_ms()}"
+  order_id = _gen_id("SIM-MKT")
   order = {
     "id": order_id,
     "type": "market",
@@ -1410,22 +1886,53 @@ def api_order_market():
     "updated_at": _now_ms(),
     "cancel_after": None
   }
-  with order_lock:
-    paper_orders[order_id] = order
+  paper_orders.put(order_id, order)
   msg = f"[PAPER] Market {order['side'].upper()} {qty} {symbol} placed and filled."
-  return jsonify(ok=True, order_id=order_id, order=order, message=msg)
-
+  return _jsonify(ok=True, order_id=order_id, order=order, message=msg)
+
+
+# Limit-order auto-cancel: one timer thread drains a heap of (due, order_id)
+_cancel_heap: list = []
+_cancel_cv = threading.Condition()
+_cancel_thread = None
+
+def _auto_cancel(oid):
+  lock, shard = paper_orders.shard(oid)
+  with lock:
+    o = shard.get(oid)
+    if o and o.get("status") == "open":
+      o["status"] = "canceled"
+      o["updated_at"] = _now_ms()
+  print(f"[AUTO-CANCEL] Order {oid} cancelled (paper).")
+
+def _cancel_worker():
+  while True:
+    with _cancel_cv:
+      while not _cancel_heap or _cancel_heap[0][0] > time.monotonic():
+        _cancel_cv.wait(_cancel_heap[0][0] - time.monotonic() if _cancel_heap else None)
+      _, oid = heapq.heappop(_cancel_heap)
+    _auto_cancel(oid)
+
+def _schedule_cancel(oid, secs):
+  """Cancel order oid (if still open) after max(1, secs) seconds."""
+  global _cancel_thread
+  with _cancel_cv:
+    heapq.heappush(_cancel_heap, (time.monotonic() + max(1, secs), oid))
+    if _cancel_thread is None:
+      _cancel_thread = threading.Thread(target=_cancel_worker, daemon=True)
+      _cancel_thread.start()
+    _cancel_cv.notify()
 
 @app.route("/api/order/limit", methods=["POST"])
 def api_order_limit():
-  data = request.get_json(silent=True) or {}
+  data = _body()
   symbol = data.get("symbol", DEFAULT_SYMBOL)
   price = float(data.get("price", 0))
   qty = float(data.get("qty", 1))
   side = str(data.get("side", "buy")).lower()
   cancel_after = int(data.get("cancel_after", 15))
 
-  order_id = f"SIM-LMT-{_now_ms()}"
+  order_id = _gen_id("SIM-LMT")
   order = {
     "id": order_id,
     "type": "limit",
@@ -1438,59 +1945,48 @@ def api_order_limit():
     "updated_at": _now_ms(),
     "cancel_after": cancel_after
   }
-  with order_lock:
-    paper_orders[order_id] = order
-
-  def cancel_later(oid, secs):
-    time.sleep(max(1, secs))
-    with order_lock:
-      o = paper_orders.get(oid)
-      if o and o.get("status") == "open":
-        o["status"] = "canceled"
-        o["updated_at"] = _now_ms()
-    print(f"[AUTO-CANCEL] Order {oid} cancelled (paper).")
-
-  threading.Thread(target=cancel_later, args=(order_id, cancel_after), daemon=True).start()
+  paper_orders.put(order_id, order)
+  _schedule_cancel(order_id, cancel_after)
   side_txt = "BUY" if side != "sell" else "SELL"
   msg = f"[PAPER] Limit {side_txt} {qty} {symbol} @ {price}. Auto-cancel in {cancel_after}s."
-  return jsonify(ok=True, order_id=order_id, order=order, message=msg)
+  return _jsonify(ok=True, order_id=order_id, order=order, message=msg)
 
 
 # --- Order management endpoints ---
 @app.route("/api/orders")
 def api_orders():
   status = request.args.get("status")  # optional: open/filled/canceled
-  with order_lock:
-    values = list(paper_orders.values())
+  values = paper_orders.values()
   if status:
     values = [o for o in values if o.get("status") == status]
-  return jsonify(ok=True, orders=values, count=len(values))
+  return _jsonify(ok=True, orders=values, count=len(values))
 
 @app.route("/api/order/cancel", methods=["POST"])
 def api_order_cancel():
-  data = request.get_json(silent=True) or {}
+  data = _body()
   oid = data.get("order_id")
   if not oid:
-    return jsonify(ok=False, message="order_id required"), 400
-  with order_lock:
-    o = paper_orders.get(oid)
+    return _jsonify(ok=False, message="order_id required"), 400
+  lock, shard = paper_orders.shard(oid)
+  with lock:
+    o = shard.get(oid)
     if not o:
-      return jsonify(ok=False, message="order not found"), 404
+      return _jsonify(ok=False, message="order not found"), 404
     if o.get("status") != "open":
-      return jsonify(ok=False, message=f"order status is {o.get('status')} (not open)"), 409
+      return _jsonify(ok=False, message=f"order status is {o.get('status')} (not open)"), 409
     o["status"] = "canceled"
     o["updated_at"] = _now_ms()
-  return jsonify(ok=True, message=f"Order {oid} canceled.", order=paper_orders.get(oid))
+  return _jsonify(ok=True, message=f"Order {oid} canceled.", order=paper_orders.get(oid))
 
 
 # --- Config endpoints for strategy params ---
 @app.route("/api/config", methods=["GET"])
 def api_config_get():
-  return jsonify(ok=True, strategy=strategy_cfg)
+  return _jsonify(ok=True, strategy=strategy_cfg)
 
 @app.route("/api/config", methods=["POST"])
 def api_config_set():
-  data = request.get_json(silent=True) or {}
+  data = _body()
   # Only update known keys
   for k in ("window", "multiplier", "lookback"):
     if k in data:
@@ -1501,59 +1997,118 @@ def api_config_set():
           strategy_cfg[k] = int(data[k])
       except Exception:
         pass
-  return jsonify(ok=True, strategy=strategy_cfg)
+  _warm_spike_scanner()
+  return _jsonify(ok=True, strategy=strategy_cfg)
 
 # --- Backtest report endpoint (CSV/JSON) ---
 @app.route("/api/backtest/report", methods=["POST"])
 def api_backtest_report():
   fmt = request.args.get("format", "json")
   # Run backtest using posted body
-  res = api_backtest()
-  # api_backtest returns a Response; get JSON if possible
-  if hasattr(res, "json"):
-    data = res.json
-  else:
-    # When called internally, Flask may return a tuple; handle common cases
-    try:
-      data = res.get_json()
-    except Exception:
-      return res
-  if not data or not data.get("ok"):
-    return res
-  if fmt == "csv":
-    import io, csv
-    sio = io.StringIO()
-    w = csv.DictWriter(sio, fieldnames=list(data["trades"][0].keys()) if data["trades"] else ["i"])
-    w.writeheader()
-    for t in data["trades"]:
-      w.writerow(t)
-    csv_bytes = sio.getvalue()
-    return app.response_class(csv_bytes, mimetype="text/csv")
-  return res
+  params = _backtest_params(_body())
+  data = _backtest_core(_snapshot(params[0]), *params)
+  if fmt == "csv" and data.get("ok"):
+    return app.response_class(_iter_csv(data["trades"]), mimetype="text/csv")
+  return _jsonify(data)
+
+def _iter_csv(rows):
+  """Stream dict rows as CSV one line at a time, reusing a single small buffer."""
+  fields = sorted(rows[0]) if rows else ["i"]  # same column order as the sorted-key JSON
+  buf = io.StringIO()
+  w = csv.writer(buf)
+  w.writerow(fields)
+  for row in rows:
+    yield buf.getvalue()
+    buf.seek(0)
+    buf.truncate()
+    w.writerow([row.get(f, "") for f in fields])
+  yield buf.getvalue()
 
-if __name__ == "__main__":
-  print(f"Websocket available: {WEBSOCKET_AVAILABLE}. Connecting to {PUBLIC_WS_URL} for {DEFAULT_SYMBOL}/{DEFAULT_INTERVAL}...")
-  HOST = os.getenv("HOST", "127.0.0.1")
-  PORT = int(os.getenv("PORT", "5000"))
-  app.run(host=HOST, port=PORT, debug=True)
 # --- Strategy presets endpoints ---
-PRESETS = {
-  "aggressive": {"window": 5, "multiplier": 1.3, "lookback": 10},
-  "balanced": {"window": 10, "multiplier": 1.6, "lookback": 20},
-  "conservative": {"window": 20, "multiplier": 2.0, "lookback": 30},
-}
+# Read-only views: presets are shared by every request thread and must never be written through
+PRESETS = MappingProxyType({
+  "aggressive": MappingProxyType({"window": 5, "multiplier": 1.3, "lookback": 10}),
+  "balanced": MappingProxyType({"window": 10, "multiplier": 1.6, "lookback": 20}),
+  "conservative": MappingProxyType({"window": 20, "multiplier": 2.0, "lookback": 30}),
+})
+# Plain-dict copy for serialization (JSON encoders don't take mapping proxies), built once
+_PRESETS_JSON = {name: dict(cfg) for name, cfg in PRESETS.items()}
 
 @app.route("/api/strategy/presets", methods=["GET"])
 def api_strategy_presets_get():
-  return jsonify(ok=True, presets=PRESETS, current=strategy_cfg)
+  return _jsonify(ok=True, presets=_PRESETS_JSON, current=strategy_cfg)
 
 @app.route("/api/strategy/presets", methods=["POST"])
+@app.route("/api/config/preset", methods=["POST"])
 def api_strategy_presets_post():
-  data = request.get_json(silent=True) or {}
+  data = _body()
   name = str(data.get("name","")).lower()
-  if name not in PRESETS:
-    return jsonify(ok=False, reason=f"unknown preset '{name}'", available=list(PRESETS.keys())), 400
-  cfg = PRESETS[name]
-  for k,v in cfg.items():
-    strategy_cfg[k] = v
-  return jsonify(ok=True, applied=name, strategy=strategy_cfg)
\ No newline at end of file
+  cfg = PRESETS.get(name)
+  if cfg is None:
+    return _jsonify(ok=False, reason=f"unknown preset '{name}'", available=list(PRESETS.keys())), 400
+  strategy_cfg.update(cfg)  # one call, so readers never see a half-applied preset
+  _warm_spike_scanner()
+  return _jsonify(ok=True, applied=name, strategy=strategy_cfg)
+
+# --- Batch endpoint (several sub-requests in one round trip) ---
+BATCH_MAX = 32
+
+@app.route("/api/batch", methods=["POST"])
+def api_batch():
+  """Dispatch each {"method","path","body"} through the normal routing; results come back in order."""
+  data = _body()
+  reqs = data.get("requests")
+  if not isinstance(reqs, list) or not reqs:
+    return _jsonify(ok=False, reason="requests[] required"), 400
+  if len(reqs) > BATCH_MAX:
+    return _jsonify(ok=False, reason=f"at most {BATCH_MAX} requests per batch"), 400
+  results = []
+  for r in reqs:
+    r = r if isinstance(r, dict) else {}
+    path = str(r.get("path") or "")
+    method = str(r.get("method") or "GET").upper()
+    if not path.startswith("/api/") or path.split("?", 1)[0] == "/api/batch":
+      results.append({"path": path, "status": 400, "body": {"ok": False, "reason": "unsupported path"}})
+      continue
+    try:
+      with app.test_request_context(path, method=method, json=r.get("body")):
+        resp = app.full_dispatch_request()
+        body = resp.get_json(silent=True) if resp.is_json else resp.get_data(as_text=True)
+    except Exception as e:
+      # one failing sub-request must not take down the rest of the batch
+      results.append({"path": path, "status": 500, "body": {"ok": False, "reason": f"{type(e).__name__}: {e}"}})
+      continue
+    results.append({"path": path, "status": resp.status_code, "body": body})
+  return _jsonify(ok=True, results=results)
+# --------------------------- Serving ---------------------------
+# Cap in-flight requests so bursts queue instead of piling onto the shared locks. The
+# slot covers the view call, where the work and locking happen, so a client that never
+# drains or closes its response cannot leak it. Some views block on I/O (bootstrap
+# fetches), so the default allows 4 per core rather than 1; set MAX_INFLIGHT to tune it.
+MAX_INFLIGHT = int(os.getenv("MAX_INFLIGHT", str(4 * (os.cpu_count() or 1))))
+_inflight = threading.BoundedSemaphore(MAX_INFLIGHT)
+
+def _limit_inflight(wsgi_app):
+  def wrapped(environ, start_response):
+    with _inflight:
+      return wsgi_app(environ, start_response)
+  return wrapped
+
+app.wsgi_app = _limit_inflight(app.wsgi_app)
+
+# Serve `app` from a threaded WSGI server in a single process, since the WS thread and all
+# buffers/positions live in it: `python app.py` (waitress when installed) or
+# `gunicorn -w 1 --threads 16 app:app`. There is no ASGI entry point: asgiref's WsgiToAsgi
+# runs every request on one thread-sensitive executor thread, i.e. one at a time.
+
+if __name__ == "__main__":
+  print(f"Websocket available: {WEBSOCKET_AVAILABLE}. Connecting to {PUBLIC_WS_URL} for {DEFAULT_SYMBOL}/{DEFAULT_INTERVAL}...")
+  HOST = os.getenv("HOST", "127.0.0.1")
+  PORT = int(os.getenv("PORT", "5000"))
+  # Werkzeug's debugger allows code execution from the browser, so it is opt-in
+  DEBUG = os.getenv("FLASK_DEBUG", "0").lower() in ("1", "true", "yes")
+  if WAITRESS_AVAILABLE and not DEBUG:
+    waitress.serve(app, host=HOST, port=PORT, threads=MAX_INFLIGHT)
+  else:
+    # No reloader: its parent process would import the app and open a second WS connection
+    app.run(host=HOST, port=PORT, debug=DEBUG, use_reloader=False, threaded=True)
@@ -9,38 +9,171 @@ Bitunix simple client (clean v2)
 Env vars required (export in your shell first):
   export BITUNIX_API_KEY="..."
   export BITUNIX_SECRET_KEY="..."
+
+Optional:
+  export BITUNIX_PAIRS_CACHE="/path/pairs.json"   # trading-pairs disk cache; "off" disables it
 """
 
-import os, time, json, hashlib, secrets, argparse
+import os, sys, time, json, hashlib, importlib.util, itertools, argparse, logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, Optional
+from urllib.parse import urlencode
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson is optional: faster body encoding when installed, stdlib json otherwise
+try:
+    import orjson  # type: ignore
+    ORJSON_AVAILABLE = True
+except Exception:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# httpx (with its http2 extra) is optional: when installed, calls share one multiplexed
+# HTTP/2 connection; otherwise the pooled requests session below is used
+try:
+    import httpx  # type: ignore
+except Exception:
+    httpx = None
+# the http2 extra (h2) is probed, not imported, so no module-level name is bound
+HTTPX_AVAILABLE = httpx is not None and importlib.util.find_spec("h2") is not None
 
 BASE = "https://fapi.bitunix.com"
 
+# Request/response tracing; --debug turns it on. Messages use lazy %-args, so nothing is
+# formatted unless DEBUG is enabled.
+log = logging.getLogger("bitunix")
+
+# Trading-pair constraints barely change: keep them for PAIRS_TTL seconds in memory and on
+# disk. BITUNIX_PAIRS_CACHE overrides the file; set it to "" / "off" for memory only.
+_pairs_cache_env = os.getenv("BITUNIX_PAIRS_CACHE",
+                             os.path.join(os.getenv("XDG_CACHE_HOME") or "~/.cache", "bitunix_pairs.json"))
+PAIRS_CACHE_PATH: Optional[str] = (None if _pairs_cache_env.strip().lower() in ("", "0", "off", "none")
+                                   else os.path.expanduser(_pairs_cache_env))
+PAIRS_TTL = 3600.0
+_pairs_mem: Dict[str, tuple] = {}  # symbol -> (monotonic expiry, pair info)
+
+# One keep-alive session for the whole run: the account -> pairs -> order -> status
+# -> cancel sequence reuses a single TLS connection instead of a handshake per call.
+# Both clients take the same get/post(url, params=, headers=, timeout=) calls and return
+# responses with .status_code/.text/.content/.json(), and share one retry policy.
+RETRIES = 2
+RETRY_BACKOFF = 0.2
+RETRY_STATUSES = (502, 503, 504)
+
+if HTTPX_AVAILABLE:
+    class _RetryTransport(httpx.BaseTransport):
+        """Status retries for httpx, matching urllib3's Retry on the requests path: only
+        GETs (idempotent) are retried on RETRY_STATUSES, with the same backoff."""
+
+        def __init__(self, inner: "httpx.BaseTransport"):
+            self._inner = inner
+
+        def handle_request(self, request):
+            for attempt in range(RETRIES + 1):
+                resp = self._inner.handle_request(request)
+                if request.method != "GET" or resp.status_code not in RETRY_STATUSES or attempt == RETRIES:
+                    return resp
+                resp.close()
+                time.sleep(RETRY_BACKOFF * 2 ** attempt if attempt else 0.0)
+
+        def close(self) -> None:
+            self._inner.close()
+
+    def _httpx_client(transport: Optional["httpx.BaseTransport"] = None) -> "httpx.Client":
+        """HTTP/2 client with the requests session's redirect, retry and timeout behaviour."""
+        if transport is None:
+            # retries= here covers connection failures, like urllib3's connect retries
+            transport = httpx.HTTPTransport(
+                http2=True, retries=RETRIES,
+                limits=httpx.Limits(max_connections=8, max_keepalive_connections=8),
+            )
+        return httpx.Client(transport=_RetryTransport(transport), follow_redirects=True, timeout=20)
+
+
+def _requests_session() -> requests.Session:
+    """requests fallback with the same policy: status retries on RETRY_STATUSES, and once
+    they run out the last 5xx response is returned (raise_on_status=False), as the httpx
+    transport does, instead of urllib3 raising RetryError into callers."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4, pool_maxsize=16,
+        max_retries=Retry(total=RETRIES, backoff_factor=RETRY_BACKOFF, status_forcelist=RETRY_STATUSES,
+                          raise_on_status=False),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+_SESSION = _httpx_client() if HTTPX_AVAILABLE else _requests_session()
+
 # ----------------------------- signing helpers -----------------------------
+# Nonces only need to be unique: a per-process random prefix plus a counter keeps the
+# 32-hex-char format without drawing fresh OS randomness for every request.
+_NONCE_PREFIX = os.urandom(8).hex()
+_NONCE_CTR = itertools.count(1)
+# Fresh-state hasher that each signature copies instead of constructing a new one; nothing
+# can be pre-fed, since the preimage starts with the per-request nonce
+_SHA256_INIT = hashlib.sha256()
+
 def sha256_hex(s: str) -> str:
     return hashlib.sha256(s.encode("utf-8")).hexdigest()
 
+@lru_cache(maxsize=8)
+def _key_bytes(key: str) -> bytes:
+    """UTF-8 bytes of an api/secret key, encoded once per key rather than per request."""
+    return key.encode("utf-8")
+
+def encode_body(body_obj: Dict) -> bytes:
+    """Compact JSON body bytes; these exact bytes are both signed and sent."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(body_obj)
+    return json.dumps(body_obj, separators=(",", ":")).encode("utf-8")
+
 def canonical_qp(params: Dict[str, str]) -> str:
     """Concat as key+value in ASCII key order (no '=' or '&')."""
     if not params:
         return ""
-    items = sorted((k, str(v)) for k, v in params.items())
-    return "".join(f"{k}{v}" for k, v in items)
+    # keys are unique, so sorting items orders by key alone; f-string formatting of a
+    # value is its str(), and a no-op when the value already is one
+    return "".join([f"{k}{v}" for k, v in sorted(params.items())])
+
+@lru_cache(maxsize=64)
+def _query_parts(items: tuple) -> tuple:
+    """(canonical_qp bytes, urlencoded query) for key-sorted param items.
+    Polling the same endpoint repeats the same items, so both strings are built once."""
+    return "".join([f"{k}{v}" for k, v in items]).encode("utf-8"), urlencode(items)
 
 def make_signature(api_key: str, secret_key: str,
-                   params: Dict[str, str], body_obj: Optional[Dict]) -> Dict[str, str]:
+                   params: Dict[str, str], body_obj: Optional[Dict],
+                   body_bytes: Optional[bytes] = None,
+                   qp_bytes: Optional[bytes] = None) -> Dict[str, str]:
     """
     digest = SHA256(nonce + timestamp + api-key + queryParams + body)
     sign   = SHA256(digest + secretKey)
-    body is compact JSON (no spaces).
+    body is compact JSON (no spaces); pass body_bytes / qp_bytes to sign an already
+    encoded body / canonical query. nonce and timestamp are always fresh.
     """
-    qp_str   = canonical_qp(params)
-    body_str = "" if body_obj is None else json.dumps(body_obj, separators=(",", ":"))
-    nonce    = secrets.token_hex(16)
-    ts       = str(int(time.time() * 1000))
-    digest   = sha256_hex(f"{nonce}{ts}{api_key}{qp_str}{body_str}")
-    sign     = sha256_hex(f"{digest}{secret_key}")
+    if qp_bytes is None:
+        qp_bytes = canonical_qp(params).encode("utf-8")
+    if body_bytes is None:
+        body_bytes = b"" if body_obj is None else encode_body(body_obj)
+    nonce    = f"{_NONCE_PREFIX}{next(_NONCE_CTR):016x}"
+    ts       = str(time.time_ns() // 1_000_000)
+    h = _SHA256_INIT.copy()
+    h.update(nonce.encode())
+    h.update(ts.encode())
+    h.update(_key_bytes(api_key))
+    h.update(qp_bytes)
+    h.update(body_bytes)
+    h2 = _SHA256_INIT.copy()
+    h2.update(h.hexdigest().encode())
+    h2.update(_key_bytes(secret_key))
+    sign     = h2.hexdigest()
     return {
         "api-key": api_key,
         "sign": sign,
@@ -51,175 +184,313 @@ def make_signature(api_key: str, secret_key: str,
     }
 
 # ------------------------------- HTTP helpers ------------------------------
-def do_get(path: str, api_key: str, secret_key: str,
-           params: Dict[str, str], debug: bool = False):
+def _json(r):
+    """Decode a response body; orjson reads the raw bytes, skipping requests' charset/text step."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(r.content)
+    return r.json()
+
+def _signed_query(url: str, params: Dict[str, str]) -> tuple:
+    """(url with its encoded query, canonical_qp bytes); the query is sorted like the
+    signature, so the HTTP client does no params pass of its own."""
+    if not params:
+        return url, b""
+    qp_bytes, qs = _query_parts(tuple(sorted(params.items())))
+    return f"{url}?{qs}", qp_bytes
+
+def do_get(path: str, api_key: str, secret_key: str, params: Dict[str, str]):
     url = f"{BASE}{path}"
-    headers = make_signature(api_key, secret_key, params, None)
-    if debug:
-        print(f"[GET🔐] {url}")
-        print("qp_str:", canonical_qp(params))
-        print("sign  :", headers["sign"])
-    r = requests.get(url, params=params, headers=headers, timeout=20)
-    if debug:
-        print("STATUS:", r.status_code)
-        print("PARAMS:", json.dumps(params))
-        print("RESP  :", r.text)
+    full_url, qp_bytes = _signed_query(url, params)
+    headers = make_signature(api_key, secret_key, params, None, qp_bytes=qp_bytes)
+    traced = log.isEnabledFor(logging.DEBUG)  # guards the decodes below
+    if traced:
+        log.debug("[GET🔐] %s\nqp_str: %s\nsign  : %s", url, qp_bytes.decode("utf-8"), headers["sign"])
+    r = _SESSION.get(full_url, headers=headers, timeout=20)
+    if traced:
+        log.debug("STATUS: %s\nPARAMS: %s\nRESP  : %s", r.status_code, json.dumps(params), r.text)
     return r
 
-def do_post(path: str, api_key: str, secret_key: str,
-            params: Dict[str, str], body: Dict, debug: bool = False):
+def do_post(path: str, api_key: str, secret_key: str, params: Dict[str, str], body: Dict):
     url = f"{BASE}{path}"
-    headers = make_signature(api_key, secret_key, params, body)
-    if debug:
-        print(f"[POST🔐] {url}")
-        print("qp_str:", canonical_qp(params))
-        print("body  :", json.dumps(body, separators=(",", ":")))
-        print("sign  :", headers["sign"])
-    r = requests.post(url, params=params, headers=headers,
-                      data=json.dumps(body, separators=(",", ":")), timeout=20)
-    if debug:
-        print("STATUS:", r.status_code)
-        print("RESP  :", r.text)
+    body_bytes = encode_body(body)
+    full_url, qp_bytes = _signed_query(url, params)
+    headers = make_signature(api_key, secret_key, params, body, body_bytes=body_bytes, qp_bytes=qp_bytes)
+    traced = log.isEnabledFor(logging.DEBUG)
+    if traced:
+        log.debug("[POST🔐] %s\nqp_str: %s\nbody  : %s\nsign  : %s",
+                  url, qp_bytes.decode("utf-8"), body_bytes.decode("utf-8"), headers["sign"])
+    # raw bytes go in content= for httpx, data= for requests
+    body_kw = {"content": body_bytes} if HTTPX_AVAILABLE else {"data": body_bytes}
+    r = _SESSION.post(full_url, headers=headers, timeout=20, **body_kw)
+    if traced:
+        log.debug("STATUS: %s\nRESP  : %s", r.status_code, r.text)
     return r
 
 # ---------------------------- new helpers -----------------------------------
-def check_order_status(api_key: str, secret_key: str, symbol: str, margin_coin: str, order_id: str, debug: bool = False):
+def check_order_status(api_key: str, secret_key: str, symbol: str, margin_coin: str, order_id: str):
     params = {"marginCoin": margin_coin, "symbol": symbol}
-    if debug:
-        print(f"check_order_status params: marginCoin={margin_coin}, symbol={symbol}")
-    r = do_get("/api/futures/v1/trade/open_orders", api_key, secret_key, params, debug)
+    log.debug("check_order_status params: marginCoin=%s, symbol=%s", margin_coin, symbol)
+    r = do_get("/api/futures/v1/trade/open_orders", api_key, secret_key, params)
     try:
         try:
-            j = r.json()
+            j = _json(r)
         except Exception as e:
-            if debug:
-                print(f"Failed to parse JSON from open_orders response: {e}")
-                print("Raw response text:", r.text)
+            log.debug("Failed to parse JSON from open_orders response: %s\nRaw response text: %s", e, r.text)
             return None
         data = j.get("data") or []
-        if j.get("code") != 0 or not data:
-            if debug:
-                print(f"Nonzero code or empty data in open_orders response: {j}")
+        if j.get("code") != 0:
+            log.debug("Nonzero code in open_orders response: %s", j)
             return {"code": j.get("code", -1), "msg": j.get("msg", "Unknown error"), "data": data}
-        if debug:
-            print(f"Searching open_orders for orderId={order_id}")
-        found_order = None
-        for p in data:
-            if p.get("orderId") == order_id:
-                found_order = p
-                break
+        if not data or not isinstance(data, list):
+            # no open orders at all: the order is not open (filled or cancelled)
+            log.debug("Empty data in open_orders response: %s", j)
+            return {"code": 404, "msg": "Order not found in open orders"}
+        log.debug("Searching open_orders for orderId=%s", order_id)
+        # one pass per response that stops at the match; a throwaway orderId index would
+        # cost the same full pass plus the dict
+        found_order = next((p for p in data if p.get("orderId") == order_id), None)
         if found_order:
-            if debug:
-                print(f"Found order {order_id} in open orders.")
+            log.debug("Found order %s in open orders.", order_id)
             return {"code": 0, "data": found_order}
         else:
-            if debug:
-                print(f"Order {order_id} not found in open orders.")
+            log.debug("Order %s not found in open orders.", order_id)
             return {"code": 404, "msg": "Order not found in open orders"}
     except Exception as e:
-        if debug:
-            print(f"Failed to parse JSON or search open orders: {e}")
-            print("Raw response text:", getattr(r, 'text', '(no text)'))
+        log.warning("Failed to parse JSON or search open orders: %s\nRaw response text: %s",
+                    e, getattr(r, 'text', '(no text)'))
         return None
 
-def cancel_order(api_key: str, secret_key: str, margin_coin: str, order_id: str, debug: bool = False):
+def wait_for_fill(api_key: str, secret_key: str, symbol: str, margin_coin: str, order_id: str,
+                  timeout: float, poll_interval: float = 0.5):
+    """
+    Poll check_order_status every poll_interval seconds until the order is filled
+    (status 2), has left the open-order book (code 404), or timeout seconds pass.
+    Returns the last status response, like a single check_order_status call would.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        time.sleep(max(0.0, min(poll_interval, deadline - time.monotonic())))
+        status_resp = check_order_status(api_key, secret_key, symbol, margin_coin, order_id)
+        if status_resp:
+            if status_resp.get("code") == 404:
+                return status_resp
+            order = status_resp.get("data")
+            if status_resp.get("code") == 0 and isinstance(order, dict) and order.get("status") in [2, "2"]:
+                return status_resp
+        if time.monotonic() >= deadline:
+            return status_resp
+
+def cancel_order(api_key: str, secret_key: str, margin_coin: str, order_id: str):
     params = {"marginCoin": margin_coin}
     body = {"orderId": order_id}
-    r = do_post("/api/v1/futures/trade/cancel", api_key, secret_key, params, body, debug)
+    r = do_post("/api/v1/futures/trade/cancel", api_key, secret_key, params, body)
     try:
-        return r.json()
+        return _json(r)
     except Exception:
-        if debug:
-            print("Failed to parse JSON from cancel order response")
+        log.debug("Failed to parse JSON from cancel order response")
         return None
 
+def _monitor_and_cancel(api_key: str, secret_key: str, symbol: str, margin_coin: str, response,
+                        timeout: float, order_type: str) -> None:
+    """After placing an order: for LIMIT orders with timeout > 0, wait up to timeout
+    seconds for a fill and cancel the order if it is still open."""
+    if timeout <= 0 or order_type.lower() != "limit":
+        return
+    try:
+        j = _json(response)
+        placed = j.get("data")
+        order_id = placed.get("orderId") if isinstance(placed, dict) else None
+        if not order_id:
+            log.debug("No orderId returned, cannot check order status or cancel")
+        else:
+            log.debug("Polling order status for up to %s seconds...", timeout)
+            status_resp = wait_for_fill(api_key, secret_key, symbol, margin_coin, order_id, timeout)
+            order_data = status_resp.get("data") if status_resp else None
+            if status_resp and status_resp.get("code") == 0 and isinstance(order_data, dict):
+                status = order_data.get("status")
+                log.debug("Order status after wait: %s", status)
+                # Assuming status codes: 2 = filled/closed, others are open or partially filled
+                if status not in [2, "2"]:
+                    log.debug("Order %s not filled after %s seconds, cancelling...", order_id, timeout)
+                    cancel_resp = cancel_order(api_key, secret_key, margin_coin, order_id)
+                    print(f"Order cancelled: {cancel_resp}")
+                else:
+                    log.debug("Order %s filled within timeout.", order_id)
+            else:
+                log.debug("Failed to get order status or order not found.")
+    except Exception:
+        # the order may still be open on the exchange, so this must not pass silently
+        log.exception("Order status check/cancel failed")
+
 # --------------------------------- calls -----------------------------------
-def get_account(api_key: str, secret_key: str, margin_coin: str = "USDT", debug: bool = False):
+def get_account(api_key: str, secret_key: str, margin_coin: str = "USDT"):
     params = {"marginCoin": margin_coin}
-    return do_get("/api/v1/futures/account", api_key, secret_key, params, debug)
+    return do_get("/api/v1/futures/account", api_key, secret_key, params)
 
-def get_trading_pairs(symbols: Optional[str], debug: bool = False):
+def get_trading_pairs(symbols: Optional[str]):
     url = f"{BASE}/api/v1/futures/market/trading_pairs"
     params = {}
     if symbols:
         params["symbols"] = symbols
-    r = requests.get(url, params=params, timeout=20)
-    if debug:
-        print(f"[GET🌐] {url}")
-        print("STATUS:", r.status_code)
-        print("RESP  :", r.text)
+    r = _SESSION.get(url, params=params, timeout=20)
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("[GET🌐] %s\nSTATUS: %s\nRESP  : %s", url, r.status_code, r.text)
     return r
 
+def _load_pairs_cache() -> Dict[str, Dict]:
+    if PAIRS_CACHE_PATH is None:
+        return {}
+    try:
+        with open(PAIRS_CACHE_PATH, "rb") as f:
+            disk = json.loads(f.read())
+        return disk if isinstance(disk, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _save_pairs_cache(disk: Dict[str, Dict]) -> None:
+    if PAIRS_CACHE_PATH is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(PAIRS_CACHE_PATH) or ".", exist_ok=True)
+        tmp = f"{PAIRS_CACHE_PATH}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(disk, f)
+        os.replace(tmp, PAIRS_CACHE_PATH)
+    except OSError:
+        pass  # the cache is an optimization only
+
+def get_pair_info(symbol: str, ttl: float = PAIRS_TTL) -> Optional[Dict]:
+    """
+    Trading-pair entry for one symbol (minTradeVolume, ...), or None if the exchange has none.
+    Served from memory, then from PAIRS_CACHE_PATH (unless disabled), and only fetched when both are older than ttl.
+    """
+    hit = _pairs_mem.get(symbol)
+    if hit and time.monotonic() < hit[0]:
+        return hit[1]
+    now = time.time()  # disk entries outlive the process, so they expire on wall-clock time
+    disk = _load_pairs_cache()
+    entry = disk.get(symbol)
+    if not (isinstance(entry, dict) and now < entry.get("expires_at", 0)):
+        j = _json(get_trading_pairs(symbol))
+        info = None
+        if j.get("code") == 0 and j.get("data"):
+            info = next((p for p in j["data"] if p.get("symbol") == symbol), None)
+        if info is None:
+            return None
+        entry = disk[symbol] = {"expires_at": now + ttl, "data": info}
+        _save_pairs_cache(disk)
+    _pairs_mem[symbol] = (time.monotonic() + entry["expires_at"] - now, entry["data"])
+    return entry["data"]
+
+# Upper-case forms of the enum values the CLI passes (argparse choices), so the common
+# case is a dict hit instead of str.upper(); anything else still goes through upper()
+_UPPER = {v: v.upper() for v in ("BUY", "SELL", "buy", "sell", "LIMIT", "MARKET", "limit", "market",
+                                 "OPEN", "CLOSE_LONG", "CLOSE_SHORT")}
+
 def place_order_v2(api_key: str, secret_key: str, symbol: str, side: str,
                    order_type: str, qty: float, price: Optional[float],
-                   trade_side: Optional[str], margin_coin: str = "USDT",
-                   debug: bool = False):
+                   trade_side: Optional[str], margin_coin: str = "USDT"):
     """
     POST /api/v1/futures/trade/place_order
     Body: symbol, qty, side (BUY/SELL), orderType (LIMIT/MARKET), price (LIMIT only)
     In HEDGE mode, tradeSide is required: OPEN / CLOSE_LONG / CLOSE_SHORT
     """
     params = {"marginCoin": margin_coin, "symbol": symbol}
-    body: Dict[str, object] = {
-        "symbol": symbol,
-        "qty": float(qty),
-        "side": side.upper(),
-        "orderType": order_type.upper(),
-    }
-    if order_type.upper() == "LIMIT":
+    side_u = _UPPER.get(side) or side.upper()
+    type_u = _UPPER.get(order_type) or order_type.upper()
+    # one literal per order type, already in the wire key order
+    body: Dict[str, object]
+    if type_u == "LIMIT":
         if price is None:
             raise ValueError("price is required for LIMIT orders")
-        body["price"] = float(price)
+        body = {"symbol": symbol, "qty": float(qty), "side": side_u, "orderType": "LIMIT", "price": float(price)}
+    else:
+        body = {"symbol": symbol, "qty": float(qty), "side": side_u, "orderType": type_u}
     if trade_side:
-        body["tradeSide"] = trade_side.upper()
+        body["tradeSide"] = _UPPER.get(trade_side) or trade_side.upper()
 
     return do_post("/api/v1/futures/trade/place_order",
-                   api_key, secret_key, params, body, debug)
+                   api_key, secret_key, params, body)
 
 # ---------------------------- CLI: sub-commands -----------------------------
-def main() -> None:
+def _args_account(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--margin-coin", default="USDT")
+    p.add_argument("--debug", action="store_true")
+
+def _args_trading_pairs(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--symbols", default=None,
+                   help="Comma-separated symbols, e.g. DOGEUSDT,BTCUSDT")
+    p.add_argument("--debug", action="store_true")
+
+def _args_place_v2(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--symbol", required=True)
+    p.add_argument("--side", choices=["BUY", "SELL"], required=True)
+    p.add_argument("--order-type", choices=["limit", "market"], required=True)
+    p.add_argument("--qty", type=float, required=True, help="Order quantity in base asset (qty)")
+    p.add_argument("--price", type=float, help="Required for limit orders")
+    p.add_argument("--trade-side", choices=["OPEN", "CLOSE_LONG", "CLOSE_SHORT"],
+                   default="OPEN", help="Required in HEDGE mode")
+    p.add_argument("--margin-coin", default="USDT")
+    p.add_argument("--timeout", type=float, default=15.0, help="Cancel order if not filled after N seconds")
+    p.add_argument("--debug", action="store_true")
+
+def _args_place_percent(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--symbol", required=True)
+    p.add_argument("--side", choices=["BUY", "SELL"], required=True)
+    p.add_argument("--order-type", choices=["limit", "market"], required=True)
+    p.add_argument("--price", type=float, help="Price for limit orders (required if order-type=limit)")
+    p.add_argument("--percent", type=float, required=True,
+                   help="e.g., 10 means 10 percent of available balance")
+    p.add_argument("--anchor-price", type=float, required=True,
+                   help="Anchor price to convert $ to qty")
+    p.add_argument("--trade-side", choices=["OPEN", "CLOSE_LONG", "CLOSE_SHORT"],
+                   default="OPEN")
+    p.add_argument("--margin-coin", default="USDT")
+    p.add_argument("--timeout", type=float, default=15.0, help="Cancel order if not filled after N seconds")
+    p.add_argument("--submit", action="store_true", help="Actually send the order")
+    p.add_argument("--debug", action="store_true")
+
+# command -> (help, argument builder)
+_COMMANDS = {
+    "account": ("Show futures account (balance, mode, etc.)", _args_account),
+    "trading-pairs": ("Get trading pair constraints", _args_trading_pairs),
+    "place-v2": ("Place via /api/v1/futures/trade/place_order", _args_place_v2),
+    "place-percent": ("Size by percent of balance; dry-run unless --submit is given", _args_place_percent),
+}
+
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Bitunix simple client")
     sub = parser.add_subparsers(dest="cmd", required=True)
+    for name, (help_text, add_args) in _COMMANDS.items():
+        add_args(sub.add_parser(name, help=help_text))
+    return parser
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parse the command line. A known command builds only its own parser; anything else
+    (no command, top-level --help, typos) goes through the full parser for its usage/errors.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    entry = _COMMANDS.get(argv[0]) if argv else None
+    if entry is None:
+        return _build_parser().parse_args(argv)
+    p = argparse.ArgumentParser(prog=f"{os.path.basename(sys.argv[0])} {argv[0]}")
+    entry[1](p)
+    args = p.parse_args(argv[1:])
+    args.cmd = argv[0]
+    return args
+
+def _enable_debug_log() -> None:
+    """--debug: print this module's trace messages to stdout, bare, like the old prints."""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(handler)
+    log.setLevel(logging.DEBUG)
 
-    p_acct = sub.add_parser("account", help="Show futures account (balance, mode, etc.)")
-    p_acct.add_argument("--margin-coin", default="USDT")
-    p_acct.add_argument("--debug", action="store_true")
-
-    p_pairs = sub.add_parser("trading-pairs", help="Get trading pair constraints")
-    p_pairs.add_argument("--symbols", default=None,
-                         help="Comma-separated symbols, e.g. DOGEUSDT,BTCUSDT")
-    p_pairs.add_argument("--debug", action="store_true")
-
-    p_place2 = sub.add_parser("place-v2", help="Place via /api/v1/futures/trade/place_order")
-    p_place2.add_argument("--symbol", required=True)
-    p_place2.add_argument("--side", choices=["BUY", "SELL"], required=True)
-    p_place2.add_argument("--order-type", choices=["limit", "market"], required=True)
-    p_place2.add_argument("--qty", type=float, required=True, help="Order quantity in base asset (qty)")
-    p_place2.add_argument("--price", type=float, help="Required for limit orders")
-    p_place2.add_argument("--trade-side", choices=["OPEN", "CLOSE_LONG", "CLOSE_SHORT"],
-                          default="OPEN", help="Required in HEDGE mode")
-    p_place2.add_argument("--margin-coin", default="USDT")
-    p_place2.add_argument("--timeout", type=float, default=15.0, help="Cancel order if not filled after N seconds")
-    p_place2.add_argument("--debug", action="store_true")
-
-    p_pct = sub.add_parser("place-percent",
-        help="Size by percent of balance; dry-run unless --submit is given")
-    p_pct.add_argument("--symbol", required=True)
-    p_pct.add_argument("--side", choices=["BUY", "SELL"], required=True)
-    p_pct.add_argument("--order-type", choices=["limit", "market"], required=True)
-    p_pct.add_argument("--price", type=float, help="Price for limit orders (required if order-type=limit)")
-    p_pct.add_argument("--percent", type=float, required=True,
-                       help="e.g., 10 means 10 percent of available balance")
-    p_pct.add_argument("--anchor-price", type=float, required=True,
-                       help="Anchor price to convert $ to qty")
-    p_pct.add_argument("--trade-side", choices=["OPEN", "CLOSE_LONG", "CLOSE_SHORT"],
-                       default="OPEN")
-    p_pct.add_argument("--margin-coin", default="USDT")
-    p_pct.add_argument("--timeout", type=float, default=15.0, help="Cancel order if not filled after N seconds")
-    p_pct.add_argument("--submit", action="store_true", help="Actually send the order")
-    p_pct.add_argument("--debug", action="store_true")
-
-    args = parser.parse_args()
+def main() -> None:
+    args = _parse_args()
+    if args.debug:
+        _enable_debug_log()
 
     # keys
     api_key = os.getenv("BITUNIX_API_KEY", "").strip()
@@ -229,12 +500,12 @@ def main() -> None:
             raise SystemExit("Missing BITUNIX_API_KEY / BITUNIX_SECRET_KEY in environment")
 
     if args.cmd == "account":
-        r = get_account(api_key, secret, args.margin_coin, args.debug)
+        r = get_account(api_key, secret, args.margin_coin)
         print(r.text)
         return
 
     if args.cmd == "trading-pairs":
-        r = get_trading_pairs(args.symbols, args.debug)
+        r = get_trading_pairs(args.symbols)
         print(r.text)
         return
 
@@ -246,76 +517,45 @@ def main() -> None:
                            qty=args.qty,
                            price=args.price,
                            trade_side=args.trade_side,
-                           margin_coin=args.margin_coin,
-                           debug=args.debug)
+                           margin_coin=args.margin_coin)
         print(r.text)
 
         # handle timeout/cancel for limit orders
-        if args.timeout > 0 and args.order_type.lower() == "limit":
-            try:
-                j = r.json()
-                order_id = j.get("data", {}).get("orderId")
-                if not order_id:
-                    if args.debug:
-                        print("No orderId returned, cannot check order status or cancel")
-                else:
-                    if args.debug:
-                        print(f"Waiting {args.timeout} seconds before checking order status...")
-                    time.sleep(args.timeout)
-                    status_resp = check_order_status(api_key, secret, args.margin_coin, order_id, args.debug)
-                    if status_resp and status_resp.get("code") == 0:
-                        order_data = status_resp.get("data", {})
-                        status = order_data.get("status")
-                        if args.debug:
-                            print(f"Order status after wait: {status}")
-                        # Assuming status codes: 2 = filled/closed, others are open or partially filled
-                        if status not in [2, "2"]:
-                            if args.debug:
-                                print(f"Order {order_id} not filled after {args.timeout} seconds, cancelling...")
-                            cancel_resp = cancel_order(api_key, secret, args.margin_coin, order_id, args.debug)
-                            print(f"Order cancelled: {cancel_resp}")
-                        else:
-                            if args.debug:
-                                print(f"Order {order_id} filled within timeout.")
-                    else:
-                        if args.debug:
-                            print("Failed to get order status or order not found.")
-            except Exception as e:
-                if args.debug:
-                    print(f"Exception during order status check/cancel: {e}")
+        _monitor_and_cancel(api_key, secret, args.symbol, args.margin_coin, r,
+                            args.timeout, args.order_type)
         return
 
     if args.cmd == "place-percent":
-        # 1) get available balance
-        acct = get_account(api_key, secret, args.margin_coin, args.debug)
-        j = acct.json()
+        anchor = args.anchor_price
+        if anchor <= 0:  # checked before any request is made
+            raise SystemExit("--anchor-price must be > 0")
+
+        # 1) get available balance; the (independent) trading pair lookup for
+        # minTradeVolume runs on a worker thread over the same session meanwhile
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pair_future = pool.submit(get_pair_info, args.symbol)
+            acct = get_account(api_key, secret, args.margin_coin)
+        j = _json(acct)
         if not j or j.get("code") != 0:
             print("Could not fetch account:", acct.text)
             raise SystemExit(1)
         avail = float(j["data"].get("available", 0.0))
 
-        # 2) convert percent of balance (quote) -> qty (base)
-        dollars = avail * (args.percent / 100.0)
-
-        # Fetch trading pair info for minTradeVolume
+        # 2) convert percent of balance (quote) -> qty (base), raised to the
+        # exchange's minTradeVolume when below it
+        qty = avail * (args.percent / 100.0) / anchor
         try:
-            tp = get_trading_pairs(args.symbol, args.debug)
-            tp_json = tp.json()
-            if tp_json.get("code") == 0 and tp_json.get("data"):
-                pair_info = next((p for p in tp_json["data"] if p.get("symbol") == args.symbol), None)
-                if pair_info:
-                    min_qty = float(pair_info.get("minTradeVolume", 0.0))
-                    print(f"Exchange minTradeVolume for {args.symbol}: {min_qty}")
-                    if dollars / args.anchor_price < min_qty:
-                        print(f"Adjusted qty from {dollars / args.anchor_price:.6f} to minTradeVolume {min_qty}")
-                        dollars = min_qty * args.anchor_price
+            pair_info = pair_future.result()
+            if pair_info:
+                min_qty = float(pair_info.get("minTradeVolume", 0.0))
+                print(f"Exchange minTradeVolume for {args.symbol}: {min_qty}")
+                if qty < min_qty:
+                    print(f"Adjusted qty from {qty:.6f} to minTradeVolume {min_qty}")
+                    qty = min_qty
         except Exception as e:
             print(f"Warning: could not fetch trading pair info: {e}")
 
-        if args.anchor_price <= 0:
-            raise SystemExit("--anchor-price must be > 0")
-        qty = dollars / args.anchor_price
-        print(f"Calculated qty ~ {qty:.6f} (from {args.percent}% of ${avail:.6f} at anchor {args.anchor_price})")
+        print(f"Calculated qty ~ {qty:.6f} (from {args.percent}% of ${avail:.6f} at anchor {anchor})")
 
         if not args.submit:
             print("Dry-run only. Add --submit to actually send the order.")
@@ -329,43 +569,12 @@ def main() -> None:
                            qty=qty,
                            price=args.price,
                            trade_side=args.trade_side,
-                           margin_coin=args.margin_coin,
-                           debug=args.debug)
+                           margin_coin=args.margin_coin)
         print(r.text)
 
         # handle timeout/cancel for limit orders
-        if args.timeout > 0 and args.order_type.lower() == "limit":
-            try:
-                j = r.json()
-                order_id = j.get("data", {}).get("orderId")
-                if not order_id:
-                    if args.debug:
-                        print("No orderId returned, cannot check order status or cancel")
-                else:
-                    if args.debug:
-                        print(f"Waiting {args.timeout} seconds before checking order status...")
-                    time.sleep(args.timeout)
-                    status_resp = check_order_status(api_key, secret, args.margin_coin, order_id, args.debug)
-                    if status_resp and status_resp.get("code") == 0:
-                        order_data = status_resp.get("data", {})
-                        status = order_data.get("status")
-                        if args.debug:
-                            print(f"Order status after wait: {status}")
-                        # Assuming status codes: 2 = filled/closed, others are open or partially filled
-                        if status not in [2, "2"]:
-                            if args.debug:
-                                print(f"Order {order_id} not filled after {args.timeout} seconds, cancelling...")
-                            cancel_resp = cancel_order(api_key, secret, args.margin_coin, order_id, args.debug)
-                            print(f"Order cancelled: {cancel_resp}")
-                        else:
-                            if args.debug:
-                                print(f"Order {order_id} filled within timeout.")
-                    else:
-                        if args.debug:
-                            print("Failed to get order status or order not found.")
-            except Exception as e:
-                if args.debug:
-                    print(f"Exception during order status check/cancel: {e}")
+        _monitor_and_cancel(api_key, secret, args.symbol, args.margin_coin, r,
+                            args.timeout, args.order_type)
         return
 
 if __name__ == "__main__":
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Numba kernels for app.py.
+
+numba's on-disk cache re-imports the module a kernel was compiled in whenever it loads
+that kernel. app.py starts the Flask app and the WS/consumer threads on import, so the
+cached kernels live here, in a module with no import-time side effects.
+"""
+
+import numpy as np
+
+# ---- Optional dependency handling (numba) ----
+try:
+    import numba  # type: ignore
+    NUMBA_AVAILABLE = True
+except Exception:
+    numba = None
+    NUMBA_AVAILABLE = False
+
+
+def spike_hits_loop(v, window, multiplier):
+    """Indices into v whose volume / trailing-window mean >= multiplier, with the mean and ratio."""
+    n = v.shape[0]
+    m = max(n - window, 0)
+    idx = np.empty(m, dtype=np.int64)
+    avgs = np.empty(m, dtype=np.float64)
+    ratios = np.empty(m, dtype=np.float64)
+    k = 0
+    for i in range(window, n):
+        # each window is summed over its own bars in order: a running sum would drift and
+        # flip ratios that land exactly on the multiplier
+        rsum = 0.0
+        for j in range(i - window, i):
+            rsum += v[j]
+        avg = rsum / window
+        ratio = v[i] / avg if avg > 0 else 0.0
+        if ratio >= multiplier:
+            idx[k] = i
+            avgs[k] = avg
+            ratios[k] = ratio
+            k += 1
+    return idx[:k], avgs[:k], ratios[:k]
+
+def resolve_loop(h, l, ti, tp, sl, is_long, resolve_bars, tp_wins):
+    """(win, loss, bars_used) per trade entered at bar ti: first of the next resolve_bars bars to touch TP/SL."""
+    ntr = ti.shape[0]
+    win = np.zeros(ntr, dtype=np.bool_)
+    loss = np.zeros(ntr, dtype=np.bool_)
+    bars = np.zeros(ntr, dtype=np.int64)
+    for k in range(ntr):
+        i = ti[k]
+        used = 0
+        for j in range(i + 1, i + 1 + resolve_bars):
+            used += 1
+            if is_long[k]:
+                hit_tp = h[j] >= tp[k]
+                hit_sl = l[j] <= sl[k]
+            else:
+                hit_tp = l[j] <= tp[k]
+                hit_sl = h[j] >= sl[k]
+            if hit_tp and (tp_wins or not hit_sl):
+                win[k] = True
+                break
+            if hit_sl:
+                loss[k] = True
+                break
+        bars[k] = used
+    return win, loss, bars
+
+if NUMBA_AVAILABLE:
+    spike_hits = numba.njit(cache=True)(spike_hits_loop)
+    resolve_trades = numba.njit(cache=True)(resolve_loop)
+    # uncached copy for inlining into the specialized scanners app.py compiles
+    spike_hits_inline = numba.njit(inline="always")(spike_hits_loop)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Regression tests for the vectorized backtest, grid and metrics routes of app.py.
+
+Each route is checked against the original per-candle loop (kept below as the reference)
+on a fixed candle series, so payloads must match it exactly.
+
+Run: python -m unittest test_app   (from bitunix_test/)
+"""
+
+import random
+import time
+import unittest
+
+import app
+
+SYMBOL = "TESTUSDT"
+
+
+def _series(n=420, seed=11):
+    """Fixed (t, o, h, l, c, v) rows with periodic volume spikes and breakouts."""
+    rnd = random.Random(seed)
+    price, rows = 100.0, []
+    for i in range(n):
+        o = price
+        c = price + (rnd.choice([-3, 3]) if i % 11 == 0 else rnd.uniform(-1.6, 1.6))
+        h = max(o, c) + rnd.random() * 0.6
+        l = min(o, c) - rnd.random() * 0.6
+        v = 10 + rnd.random() * 5 + (60 if i % 11 == 0 else 0)
+        rows.append((1700000000000 + i * 60000, round(o, 4), round(h, 4), round(l, 4), round(c, 4), round(v, 3)))
+        price = c
+    return rows
+
+
+# ----------------------------- reference loops -----------------------------
+def _ref_backtest(buf, window, multiplier, lookback, resolve_bars=10, max_trades=200,
+                  tie_breaker="sl_wins", fee_bps=0.0, slippage=0.0):
+    """The original /api/backtest loop over a list of Candle."""
+    n = len(buf)
+    if n < max(lookback + 1, window + 1, resolve_bars + 2):
+        return {"ok": False, "reason": "insufficient candles", "available": n}
+
+    def last_spike_ratio(up_to_idx):
+        start = max(0, up_to_idx - window)
+        prev_start = max(0, up_to_idx - window * 2)
+        prev = buf[prev_start:up_to_idx - window + 1] if (up_to_idx - window) - prev_start + 1 > 0 else []
+        if len(prev) < window:
+            prev = buf[start:up_to_idx]
+        if len(prev) == 0:
+            return 0.0
+        avg_v = sum(c.v for c in prev) / float(len(prev))
+        cur = buf[up_to_idx]
+        return (cur.v / avg_v) if avg_v > 0 else 0.0
+
+    trades = []
+    i_start = max(lookback + 1, window + 1)
+    i_end = n - resolve_bars - 1
+    if i_end <= i_start:
+        return {"ok": False, "reason": "not enough forward bars to resolve"}
+    indices = list(range(i_start, i_end))[-max_trades:]
+    for i in indices:
+        prior = buf[i - lookback:i]
+        if len(prior) < lookback:
+            continue
+        hh = max(c.h for c in prior[:-1])
+        ll = min(c.l for c in prior[:-1])
+        cur = buf[i]
+        ratio = last_spike_ratio(i)
+        if cur.c > hh and ratio >= multiplier:
+            direction = "long"
+        elif cur.c < ll and ratio >= multiplier:
+            direction = "short"
+        else:
+            continue
+        entry = cur.c
+        rng = cur.h - cur.l
+        if direction == "long":
+            sl = max(ll, entry - rng)
+            tp = entry + 1.5 * (entry - sl)
+        else:
+            sl = min(hh, entry + rng)
+            tp = entry - 1.5 * (sl - entry)
+        outcome, bars_used = None, 0
+        for j in range(i + 1, min(n, i + 1 + resolve_bars)):
+            bars_used += 1
+            if direction == "long":
+                hit_tp, hit_sl = buf[j].h >= tp, buf[j].l <= sl
+            else:
+                hit_tp, hit_sl = buf[j].l <= tp, buf[j].h >= sl
+            if hit_tp and hit_sl:
+                outcome = "win" if tie_breaker == "tp_wins" else "loss"
+                break
+            if hit_tp:
+                outcome = "win"
+                break
+            if hit_sl:
+                outcome = "loss"
+                break
+        if outcome is None:
+            outcome = "open"
+        slip = slippage if direction == "long" else -slippage
+        exec_entry = entry + slip
+        if outcome == "win":
+            exec_exit = tp - slip
+        elif outcome == "loss":
+            exec_exit = sl - slip
+        else:
+            exec_exit = buf[i + bars_used].c if bars_used > 0 else entry
+        fee_mult = 1.0 - fee_bps / 10000.0
+        if direction == "long":
+            unit_pnl = (exec_exit - exec_entry) * fee_mult
+        else:
+            unit_pnl = (exec_entry - exec_exit) * fee_mult
+        trades.append({
+            "i": i, "t": cur.t, "direction": direction,
+            "entry": round(entry, 8), "sl": round(sl, 8), "tp": round(tp, 8),
+            "spike_ratio": round(ratio, 3), "hh": hh, "ll": ll,
+            "bars_to_resolve": bars_used, "outcome": outcome,
+            "exec_entry": round(exec_entry, 8), "exec_exit": round(exec_exit, 8),
+            "unit_pnl": round(unit_pnl, 8),
+            "tie_breaker": tie_breaker, "fee_bps": fee_bps, "slippage": slippage,
+        })
+
+    wins = sum(1 for t in trades if t["outcome"] == "win")
+    losses = sum(1 for t in trades if t["outcome"] == "loss")
+    opens = sum(1 for t in trades if t["outcome"] == "open")
+    total = len(trades)
+    win_rate = (wins / total) if total else 0.0
+    avg_win = (sum(t["unit_pnl"] for t in trades if t["outcome"] == "win") / wins) if wins else 0.0
+    avg_loss = (sum(t["unit_pnl"] for t in trades if t["outcome"] == "loss") / losses) if losses else 0.0
+    expectancy = (wins / total) * avg_win + (losses / total) * avg_loss if total else 0.0
+    return {
+        "ok": True, "symbol": SYMBOL,
+        "params": {"window": window, "multiplier": multiplier, "lookback": lookback,
+                   "resolve_bars": resolve_bars, "max_trades": max_trades},
+        "summary": {"total": total, "wins": wins, "losses": losses, "open": opens,
+                    "win_rate": round(win_rate, 4), "avg_win": round(avg_win, 8),
+                    "avg_loss": round(avg_loss, 8), "expectancy": round(expectancy, 8)},
+        "trades": trades,
+    }
+
+
+def _ref_metrics(closed):
+    """The original /api/metrics loop over closed positions."""
+    closed = sorted(closed, key=lambda x: x["closed_at"] or x["created_at"])
+    eq, max_eq, max_dd = [0.0], 0.0, 0.0
+    wins = losses = win_streak = loss_streak = max_win_streak = max_loss_streak = 0
+    pnl_list = []
+    for p in closed:
+        pnl = float(p.get("realized_pnl", 0.0))
+        pnl_list.append(pnl)
+        eq.append(eq[-1] + pnl)
+        max_eq = max(max_eq, eq[-1])
+        max_dd = max(max_dd, max_eq - eq[-1])
+        if pnl > 0:
+            wins += 1
+            win_streak += 1
+            loss_streak = 0
+            max_win_streak = max(max_win_streak, win_streak)
+        elif pnl < 0:
+            losses += 1
+            loss_streak += 1
+            win_streak = 0
+            max_loss_streak = max(max_loss_streak, loss_streak)
+        else:
+            win_streak = loss_streak = 0
+    total = len(closed)
+    avg_win = (sum(p for p in pnl_list if p > 0) / wins) if wins else 0.0
+    avg_loss = (sum(p for p in pnl_list if p < 0) / losses) if losses else 0.0
+    win_rate = (wins / total) if total else 0.0
+    expectancy = (wins / total) * avg_win + (losses / total) * avg_loss if total else 0.0
+    return {"ok": True, "summary": {
+        "trades": total, "wins": wins, "losses": losses, "win_rate": round(win_rate, 4),
+        "avg_win": round(avg_win, 8), "avg_loss": round(avg_loss, 8),
+        "expectancy": round(expectancy, 8), "max_drawdown": round(max_dd, 8),
+        "max_win_streak": max_win_streak, "max_loss_streak": max_loss_streak,
+        "final_equity": round(eq[-1], 8),
+    }}
+
+
+# --------------------------------- tests -----------------------------------
+class BacktestRoutesTest(unittest.TestCase):
+    """/api/backtest and /api/backtest/grid match the reference loop on a fixed series."""
+
+    @classmethod
+    def setUpClass(cls):
+        ring = app._ensure_buffers(SYMBOL)[0]
+        with app.buffer_lock:
+            ring.clear()
+            ring.extend(_series())
+        cls.buf = list(ring)
+        cls.client = app.app.test_client()
+
+    def _post(self, path, body):
+        r = self.client.post(path, json=dict(body, symbol=SYMBOL))
+        self.assertEqual(r.status_code, 200)
+        return r.get_json()
+
+    def test_backtest_matches_reference(self):
+        cases = [
+            dict(window=20, multiplier=2.5, lookback=20),
+            dict(window=5, multiplier=1.3, lookback=10, tie_breaker="tp_wins", fee_bps=10.0, slippage=0.01),
+            dict(window=3, multiplier=1.1, lookback=5, resolve_bars=1),
+            dict(window=10, multiplier=1.6, lookback=20, resolve_bars=0, max_trades=50),
+            dict(window=5, multiplier=1.3, lookback=10, resolve_bars=3, fee_bps=5.0),
+        ]
+        for case in cases:
+            with self.subTest(**case):
+                expected = _ref_backtest(self.buf, **case)
+                self.assertTrue(expected["summary"]["total"] > 0)
+                self.assertEqual(self._post("/api/backtest", case), expected)
+
+    def test_grid_matches_reference(self):
+        windows, mults, looks = [3, 5, 8], [1.1, 1.5], [5, 10, 15]
+        extra = dict(tie_breaker="tp_wins", slippage=0.01)
+        results = []
+        for w in windows:
+            for m in mults:
+                for lb in looks:
+                    js = _ref_backtest(self.buf, w, m, lb, **extra)
+                    s = js["summary"]
+                    results.append({"window": w, "multiplier": m, "lookback": lb,
+                                    "total": s["total"], "wins": s["wins"], "losses": s["losses"],
+                                    "win_rate": s["win_rate"], "expectancy": s["expectancy"],
+                                    "avg_win": s["avg_win"], "avg_loss": s["avg_loss"]})
+        results.sort(key=lambda r: (r["expectancy"], r["win_rate"], r["total"]), reverse=True)
+        got = self._post("/api/backtest/grid", dict(
+            window=windows, multiplier=mults, lookback={"start": 5, "stop": 15, "step": 5}, **extra))
+        self.assertEqual(got, {"ok": True, "symbol": SYMBOL, "tried": len(results), "top": results[:10]})
+
+
+class MetricsRouteTest(unittest.TestCase):
+    """/api/metrics matches the reference loop over the closed paper positions."""
+
+    def test_metrics_matches_reference(self):
+        client = app.app.test_client()
+        for side, exit_price in [("long", 101), ("short", 99), ("long", 90), ("long", 120),
+                                 ("short", 130), ("long", 100), ("short", 80)]:
+            time.sleep(0.002)  # distinct closed_at, so the ordering does not rest on ties
+            r = client.post("/api/position/open", json={"symbol": SYMBOL, "side": side, "entry": 100,
+                                                        "qty": 1, "sl": 95, "tp": 110}).get_json()
+            client.post("/api/position/close", json={"position_id": r["position"]["id"], "price": exit_price})
+        closed = [p for p in app.positions.values() if p.get("status") == "closed"]
+        self.assertEqual(client.get("/api/metrics").get_json(), _ref_metrics(closed))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Smoke tests for the HTTP layer of bitunix_client with the network mocked out.
+
+Run: python -m unittest test_bitunix_client   (from bitunix_test/)
+"""
+
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import bitunix_client as bc
+
+try:
+    import httpx  # type: ignore
+except Exception:
+    httpx = None
+
+
+class _FakeResponse:
+    status_code = 200
+    text = '{"code":0,"data":{}}'
+    content = text.encode("utf-8")
+
+    def json(self):
+        return {"code": 0, "data": {}}
+
+
+class SignedCallsTest(unittest.TestCase):
+    """do_get/do_post go through _SESSION with a signed, key-sorted query."""
+
+    def test_do_get_signs_and_sorts_query(self):
+        with mock.patch.object(bc, "_SESSION") as session:
+            session.get.return_value = _FakeResponse()
+            bc.do_get("/api/v1/futures/account", "key", "secret", {"symbol": "BTCUSDT", "marginCoin": "USDT"})
+        url = session.get.call_args.args[0]
+        headers = session.get.call_args.kwargs["headers"]
+        self.assertEqual(url, f"{bc.BASE}/api/v1/futures/account?marginCoin=USDT&symbol=BTCUSDT")
+        self.assertEqual(headers["api-key"], "key")
+        self.assertEqual(len(headers["sign"]), 64)
+
+    def test_do_post_sends_the_signed_bytes(self):
+        with mock.patch.object(bc, "_SESSION") as session:
+            session.post.return_value = _FakeResponse()
+            bc.do_post("/api/v1/futures/trade/cancel", "key", "secret", {"marginCoin": "USDT"}, {"orderId": "1"})
+        kwargs = session.post.call_args.kwargs
+        body = kwargs.get("content", kwargs.get("data"))
+        self.assertEqual(body, bc.encode_body({"orderId": "1"}))
+
+
+class _Always502(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        self.send_response(502)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class RequestsSessionTest(unittest.TestCase):
+    """The requests fallback returns the last 5xx once retries run out, like the httpx path."""
+
+    def setUp(self):
+        _Always502.hits = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Always502)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def test_gives_up_after_retries(self):
+        session = bc._requests_session()
+        self.addCleanup(session.close)
+        r = session.get(f"http://127.0.0.1:{self.server.server_port}/x", timeout=5)
+        self.assertEqual(r.status_code, 502)
+        self.assertEqual(_Always502.hits, bc.RETRIES + 1)
+
+
+@unittest.skipUnless(bc.HTTPX_AVAILABLE, "httpx[http2] not installed")
+class HttpxClientTest(unittest.TestCase):
+    """The HTTP/2 client keeps the requests session's redirect and retry behaviour."""
+
+    def _client(self, handler):
+        return bc._httpx_client(httpx.MockTransport(handler))
+
+    def test_follows_redirects_and_retries_gets(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.path)
+            if len(calls) == 1:
+                return httpx.Response(503)
+            if request.url.path == "/old":
+                return httpx.Response(302, headers={"Location": "/new"})
+            return httpx.Response(200, json={"code": 0})
+
+        with mock.patch.object(bc.time, "sleep"):
+            r = self._client(handler).get("https://example.invalid/old")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(calls, ["/old", "/old", "/new"])
+
+    def test_gives_up_after_retries(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request.method)
+            return httpx.Response(502)
+
+        with mock.patch.object(bc.time, "sleep"):
+            r = self._client(handler).get("https://example.invalid/x")
+        self.assertEqual(r.status_code, 502)
+        self.assertEqual(len(calls), bc.RETRIES + 1)
+
+    def test_posts_are_not_retried(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request.method)
+            return httpx.Response(503)
+
+        r = self._client(handler).post("https://example.invalid/x", content=b"{}")
+        self.assertEqual(r.status_code, 503)
+        self.assertEqual(calls, ["POST"])
+
+
+if __name__ == "__main__":
+    unittest.main()